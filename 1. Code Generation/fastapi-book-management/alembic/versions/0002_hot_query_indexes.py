@@ -0,0 +1,52 @@
+"""Composite indexes for the hot query shapes
+
+- ``user_book_status (user_id, is_read, book_id)``: the per-user listings
+  filter on user and read status and join on book; the stats aggregate counts
+  by user and read status. Both are answered from the index alone.
+- ``user_book_status (book_id)``: statuses of a book (delete cascade, reader
+  recount); the unique ``(user_id, book_id)`` index cannot serve it.
+- ``books (title, id)``, ``(author, id)``, ``(published_year, id)``: keyset
+  pagination orders and seeks on ``(sort column, id)``, so pages are read in
+  index order without a sort. They supersede the single-column title and
+  author indexes.
+
+Partial-match (ILIKE) filters cannot use B-tree indexes; on PostgreSQL they
+use the pg_trgm GIN indexes created by ``ensure_search_index``.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # if_not_exists: databases created by create_tables() may already have them
+    op.create_index("ix_user_book_status_user_read_book", "user_book_status",
+                    ["user_id", "is_read", "book_id"], if_not_exists=True)
+    op.create_index("ix_user_book_status_book_id", "user_book_status", ["book_id"], if_not_exists=True)
+    op.create_index("ix_books_title_id", "books", ["title", "id"], if_not_exists=True)
+    op.create_index("ix_books_author_id", "books", ["author", "id"], if_not_exists=True)
+    op.create_index("ix_books_published_year_id", "books", ["published_year", "id"], if_not_exists=True)
+    op.drop_index("ix_books_title", table_name="books", if_exists=True)
+    op.drop_index("ix_books_author", table_name="books", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_books_author", "books", ["author"])
+    op.create_index("ix_books_title", "books", ["title"])
+    op.drop_index("ix_books_published_year_id", table_name="books")
+    op.drop_index("ix_books_author_id", table_name="books")
+    op.drop_index("ix_books_title_id", table_name="books")
+    op.drop_index("ix_user_book_status_book_id", table_name="user_book_status")
+    op.drop_index("ix_user_book_status_user_read_book", table_name="user_book_status")
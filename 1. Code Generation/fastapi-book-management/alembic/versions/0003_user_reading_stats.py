@@ -0,0 +1,41 @@
+"""Per-user reading counters
+
+``user_reading_stats`` holds each user's tracked and read book counts, kept
+up to date by the status writes when ``READING_STATS_COUNTERS`` is on, so
+``/users/me/stats`` reads one row instead of aggregating ``user_book_status``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by create_tables() since the counters were added already have it
+    if "user_reading_stats" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "user_reading_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total_books", sa.Integer(), nullable=False),
+        sa.Column("read_books", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_reading_stats")
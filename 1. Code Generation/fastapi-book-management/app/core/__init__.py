@@ -1,9 +1,12 @@
 from .config import Settings, get_settings
-from .database import engine, SessionLocal, get_db
+from .database import engine, SessionLocal, get_db, async_engine, AsyncSessionLocal, get_async_db, get_session, open_session
+from .read_replicas import get_read_session
 from .security import get_password_hash, verify_password, create_access_token, get_current_user
 
 __all__ = [
     "Settings", "get_settings",
     "engine", "SessionLocal", "get_db",
+    "async_engine", "AsyncSessionLocal", "get_async_db", "get_session", "open_session",
+    "get_read_session",
     "get_password_hash", "verify_password", "create_access_token", "get_current_user"
 ]
\ No newline at end of file
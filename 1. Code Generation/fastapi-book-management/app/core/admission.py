@@ -0,0 +1,357 @@
+"""
+Admission control and load shedding.
+
+``AdmissionControlMiddleware`` sorts API requests into route classes (auth,
+catalog and user reads, writes, bulk streams) and bounds how many of each are
+processed at once. A request holds its slot until its response is fully
+sent, so the streamed catalog export and import, which can last as long as a
+slow client takes, have a class of their own: they cannot fill the slots of
+regular reads and writes, nor skew their service time estimates. Beyond the limit, requests wait in a bounded per-class queue. A request
+is rejected with ``503 Service Unavailable`` and a ``Retry-After`` header
+when:
+- the queue is full;
+- the expected wait exceeds ``ADMISSION_MAX_WAIT_SECONDS``. The wait is
+  estimated from the queue position and the class's recent service time,
+  which sheds the request before it spends the wait;
+- the request actually waits that long.
+Under overload the server keeps serving the admitted requests at full speed
+instead of queueing every request behind the database pool until all of them
+time out.
+
+Unless ``ADMISSION_LIMITS`` sets them, the limits follow the database pool
+(``DB_POOL_SIZE + DB_MAX_OVERFLOW`` connections): auth and writes get a quarter
+of it each, streams an eighth and reads the rest, plus a full pool per read
+replica. Admitted
+requests then get a connection without waiting on the pool.
+
+Independently, ``RATE_LIMIT_PER_SECOND`` enables a token bucket per user, the
+subject of the access token (per client IP for anonymous requests or invalid
+tokens), so a user cannot raise its rate by logging in several times. A client
+over its rate gets ``429 Too Many Requests`` with the time until its next
+token.
+
+Limits are per worker process. Health, metrics and documentation endpoints
+are never limited.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .auth_cache import token_user_cache
+from .config import get_settings
+from .metrics import registry
+from .read_replicas import READ_URLS
+from .security import verify_token
+
+settings = get_settings()
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+ROUTE_CLASSES = ("auth", "read", "write", "stream")
+# Bulk endpoints whose request or response body is streamed
+STREAM_PATHS = (f"{settings.API_V1_STR}/books/export", f"{settings.API_V1_STR}/books/import")
+# Raised by verify_token for tokens that are not keyed by their subject
+_INVALID_TOKEN = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+ADMISSION_REJECTED = registry.counter(
+    "http_admission_rejected_total", "Requests shed by admission control by route class and reason",
+    ["route_class", "reason"]
+)
+ADMISSION_WAIT = registry.histogram(
+    "http_admission_wait_seconds", "Time admitted requests waited in the admission queue",
+    ["route_class"]
+)
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; carries the suggested retry delay."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Concurrency limit with a bounded FIFO queue and deadline-aware admission.
+
+    Only used from the event loop, so no locking is needed.
+
+    Args:
+        name: Route class name used in metrics
+        limit: Requests processed at once
+        max_queue: Requests allowed to wait for a slot
+        max_wait_seconds: Longest a request may wait for a slot
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        # Moving average of how long an admitted request takes to start its response
+        self.service_seconds = 0.01
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """Estimated wait of the request at ``position`` in the queue (0 is next)."""
+        return (position + 1) * self.service_seconds / self.limit
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Raises:
+            Overloaded: If the queue is full or the wait exceeds the deadline
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        expected = self.expected_wait(len(self._waiters))
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+            raise Overloaded("queue_full", expected)
+        if expected > self.max_wait_seconds:
+            self._reject("deadline")
+            raise Overloaded("deadline", expected)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the wait ended: pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            if isinstance(e, asyncio.TimeoutError):
+                self._reject("timeout")
+                raise Overloaded("timeout", self.expected_wait(len(self._waiters))) from None
+            raise
+        self.admitted += 1
+        ADMISSION_WAIT.observe(time.perf_counter() - start, (self.name,))
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def record_service_time(self, seconds: float) -> None:
+        self.service_seconds += 0.1 * (seconds - self.service_seconds)
+
+    def _reject(self, reason: str) -> None:
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(labels=(self.name, reason))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "service_ms": round(self.service_seconds * 1000, 3),
+        }
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per client key, with LRU eviction of idle clients.
+
+    Args:
+        rate: Tokens added per second (sustained requests per second)
+        burst: Bucket capacity (requests allowed in a burst)
+        max_keys: Clients tracked at once
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_keys = max_keys
+        self.limited = 0
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """
+        Take a token for ``key``.
+
+        Returns:
+            float: 0 if the request may proceed, else seconds until a token is available
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        self.limited += 1
+        ADMISSION_REJECTED.inc(labels=("client", "rate_limited"))
+        return (1 - bucket[0]) / self.rate
+
+
+def route_class(method: str, path: str) -> str:
+    """Route class of an API request: auth, stream, read or write."""
+    if path.startswith(f"{settings.API_V1_STR}/auth"):
+        return "auth"
+    if path.rstrip("/") in STREAM_PATHS:
+        return "stream"
+    return "read" if method in SAFE_METHODS else "write"
+
+
+def client_key(scope: Scope) -> str:
+    """
+    Rate limit key: the user the bearer token belongs to, or the client IP.
+
+    Tokens already seen by ``get_current_user`` are resolved from
+    ``token_user_cache``; others are verified and keyed by their subject.
+    """
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        user = token_user_cache.peek(token)
+        if user is not None:
+            return f"user:{user.username}"
+        try:
+            return f"user:{verify_token(token, _INVALID_TOKEN).username}"
+        except HTTPException:
+            pass
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def default_limits(pool_capacity: int, replicas: int = 0) -> Dict[str, int]:
+    """
+    Per-class limits sized to the database connection pool.
+
+    Args:
+        pool_capacity: Connections per engine (``DB_POOL_SIZE + DB_MAX_OVERFLOW``)
+        replicas: Read replicas, each with its own pool for reads
+
+    Returns:
+        Dict[str, int]: Concurrent requests per route class
+    """
+    share = max(1, pool_capacity // 4)
+    stream = max(1, pool_capacity // 8)
+    return {
+        "auth": share,
+        "write": share,
+        "stream": stream,
+        "read": max(1, pool_capacity - 2 * share - stream) + replicas * pool_capacity,
+    }
+
+
+ADMISSION_LIMITS = {
+    **default_limits(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW, len(READ_URLS)),
+    **settings.ADMISSION_LIMITS,
+}
+
+limiters: Dict[str, ConcurrencyLimiter] = {
+    name: ConcurrencyLimiter(name, limit, settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_MAX_WAIT_SECONDS)
+    for name, limit in ADMISSION_LIMITS.items()
+    if name in ROUTE_CLASSES and limit > 0
+}
+rate_limiter: Optional[TokenBucketLimiter] = (
+    TokenBucketLimiter(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+    if settings.RATE_LIMIT_PER_SECOND > 0 else None
+)
+
+registry.gauge("http_admission_in_flight", "Requests holding an admission slot by route class", ["route_class"],
+               lambda: {(name,): limiter.in_flight for name, limiter in limiters.items()})
+registry.gauge("http_admission_queued", "Requests waiting for an admission slot by route class", ["route_class"],
+               lambda: {(name,): limiter.queued for name, limiter in limiters.items()})
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Return per-class limiter state and rate limiting counters, for /health."""
+    return {
+        "enabled": settings.ADMISSION_CONTROL,
+        "classes": {name: limiter.stats() for name, limiter in limiters.items()},
+        "rate_limited": rate_limiter.limited if rate_limiter is not None else None,
+    }
+
+
+def _rejection(status_code: int, detail: str, error_type: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail, "type": error_type},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionControlMiddleware:
+    """Rate limit API requests per client, then admit them through their class's limiter."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(settings.API_V1_STR):
+            await self.app(scope, receive, send)
+            return
+
+        if rate_limiter is not None:
+            wait = rate_limiter.take(client_key(scope))
+            if wait:
+                response = _rejection(429, "Rate limit exceeded, please slow down", "rate_limited", wait)
+                await response(scope, receive, send)
+                return
+
+        limiter = limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            response = _rejection(503, "Server is overloaded, please retry shortly", "overloaded", e.retry_after)
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                limiter.record_service_time(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not started:
+                limiter.record_service_time(time.perf_counter() - start)
+            limiter.release()
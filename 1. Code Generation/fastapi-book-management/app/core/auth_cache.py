@@ -0,0 +1,166 @@
+"""
+In-process cache of authenticated users keyed by access token.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+import threading
+import time
+
+from sqlalchemy import event
+
+from .config import get_settings
+from ..models.user import User
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Snapshot of the user an access token belongs to."""
+    id: int
+    username: str
+    is_active: bool
+
+
+class TokenUserCache:
+    """
+    TTL + LRU cache mapping an access token to an ``AuthenticatedUser``.
+
+    Entries expire after ``ttl_seconds`` or when the token itself expires,
+    whichever comes first, and are dropped explicitly whenever the user row
+    changes. Invalidation can be triggered from threadpool workers, so all
+    access goes through a lock.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        """
+        Look up the user for a token.
+
+        Args:
+            token: Raw access token
+
+        Returns:
+            AuthenticatedUser: Cached snapshot or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= time.time():
+                self._remove(token, user.id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return user
+
+    def peek(self, token: str) -> Optional[AuthenticatedUser]:
+        """Look up the user for a token without counting a hit or miss or refreshing its LRU position."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(token)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def set(self, token: str, user: AuthenticatedUser, token_expires_at: Optional[float] = None) -> None:
+        """
+        Cache the user for a token.
+
+        Args:
+            token: Raw access token
+            user: User snapshot to cache
+            token_expires_at: Token ``exp`` claim as a UNIX timestamp
+        """
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self._lock:
+            self._entries[token] = (expires_at, user)
+            self._entries.move_to_end(token)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+
+            while len(self._entries) > self.max_size:
+                old_token, (_, old_user) = self._entries.popitem(last=False)
+                self._discard_token(old_token, old_user.id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Drop every cached token of a user.
+
+        Args:
+            user_id: ID of the user that changed
+        """
+        with self._lock:
+            tokens = self._tokens_by_user.pop(user_id, set())
+            for token in tokens:
+                self._entries.pop(token, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache size and hit/miss counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, token: str, user_id: int) -> None:
+        self._entries.pop(token, None)
+        self._discard_token(token, user_id)
+
+    def _discard_token(self, token: str, user_id: int) -> None:
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+token_user_cache = TokenUserCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    """Drop cached tokens whenever a user row is updated or deleted through the ORM."""
+    token_user_cache.invalidate_user(target.id)
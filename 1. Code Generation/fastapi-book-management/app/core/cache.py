@@ -0,0 +1,300 @@
+"""
+Response cache for catalog reads.
+
+Rendered JSON bodies are stored with their ETag under keys built from the
+normalized request parameters. Every key embeds a generation number that is
+bumped on each catalog write, so one increment invalidates all cached pages
+and items at once; entries of older generations are never read again and age
+out of the backend. A read captures the generation before querying the
+database, so a response rendered from data older than a concurrent write is
+stored under the superseded generation and is never served. That guarantee
+does not hold for a read replica, which may still lag behind the write after
+the bump: bodies rendered from a replica within ``READ_YOUR_WRITES_SECONDS``
+of an invalidation by this worker are served but not stored.
+
+Two backends are available: an in-process LRU (per worker) and a
+Redis-compatible server shared by all workers. A write only bumps the
+generation of the worker that handled it, so with several workers the memory
+backend keeps serving older pages elsewhere until they expire; its entries
+live for the short ``RESPONSE_CACHE_MEMORY_TTL_SECONDS``.
+"""
+
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+
+from .config import get_settings
+from .logging import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class CacheBackend(ABC):
+    """Interface of the response cache storage."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value, or None when absent or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        """Store a value for ``ttl_seconds``."""
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        """Return the counter at ``key`` (0 when absent)."""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Increment the counter at ``key`` and return its new value."""
+
+    async def close(self) -> None:
+        """Release the backend's connections."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process TTL + LRU backend.
+
+    Only used from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend on a Redis-compatible server, shared by all workers."""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self._client.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Generation-versioned cache of rendered JSON responses.
+
+    Args:
+        backend: Storage backend, None to disable caching (ETags still apply)
+        ttl_seconds: Lifetime of cached bodies
+        namespace: Prefix of every key
+        replica_lag_seconds: How long after an invalidation replica reads are not stored
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl_seconds: int, namespace: str = "books",
+                 replica_lag_seconds: float = 0.0):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.replica_lag_seconds = replica_lag_seconds
+        self._invalidated_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._generation_key = f"{namespace}:generation"
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> str:
+        """
+        Build the canonical key fragment of request parameters.
+
+        Unset parameters are dropped and string filters, which all match
+        case-insensitively, are lower-cased so equivalent requests share a key.
+        """
+        parts = []
+        for name in sorted(params):
+            value = params[name]
+            if value is None:
+                continue
+            if isinstance(value, str):
+                value = value.lower()
+            parts.append(f"{name}={value}")
+        return "&".join(parts)
+
+    async def respond(self, request: Request, kind: str, params: Dict[str, Any],
+                      render: Callable[[], Awaitable[Optional[bytes]]],
+                      replica: bool = False) -> Optional[Response]:
+        """
+        Serve a cached JSON body or render, cache and serve a fresh one.
+
+        Args:
+            request: Incoming request (for ``If-None-Match``)
+            kind: Kind of resource, part of the key (e.g. ``"list"``)
+            params: Parameters that select the response
+            render: Coroutine producing the JSON body, or None when there is
+                nothing to serve (e.g. the resource does not exist)
+            replica: Whether ``render`` reads from a read replica
+
+        Returns:
+            Response: 200 with the body or 304, None when ``render`` returned None
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if self.backend is None:
+            body = await render()
+            return None if body is None else self._response(body, make_etag(body), if_none_match, "BYPASS")
+
+        generation = await self.backend.get_counter(self._generation_key)
+        key = f"{self.namespace}:{generation}:{kind}:{self.normalize_params(params)}"
+
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            etag, body = cached.split(b"\n", 1)
+            return self._response(body, etag.decode(), if_none_match, "HIT")
+
+        self.misses += 1
+        body = await render()
+        if body is None:
+            return None
+        etag = make_etag(body)
+        if replica and time.monotonic() - self._invalidated_at < self.replica_lag_seconds:
+            return self._response(body, etag, if_none_match, "BYPASS")
+        await self.backend.set(key, etag.encode() + b"\n" + body, self.ttl_seconds)
+        return self._response(body, etag, if_none_match, "MISS")
+
+    async def invalidate(self) -> None:
+        """Invalidate every cached response of the namespace."""
+        if self.backend is None:
+            return
+        self._invalidated_at = time.monotonic()
+        try:
+            await self.backend.incr(self._generation_key)
+        except Exception as e:
+            # The write has committed; a stale cache must not turn it into an error
+            logger.error(f"Response cache invalidation failed: {e}")
+
+    async def close(self) -> None:
+        """Release the backend's connections."""
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend name and hit/miss counters."""
+        stats = {
+            "backend": settings.RESPONSE_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+        if isinstance(self.backend, MemoryCacheBackend):
+            stats["size"] = len(self.backend)
+        return stats
+
+    def _response(self, body: bytes, etag: str, if_none_match: Optional[str], cache_status: str) -> Response:
+        headers = {"ETag": etag, "X-Cache": cache_status}
+        if etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def create_cache_backend() -> Optional[CacheBackend]:
+    """
+    Build the backend selected by ``RESPONSE_CACHE_BACKEND``.
+
+    Returns:
+        CacheBackend: Configured backend, None when caching is disabled
+
+    Raises:
+        ValueError: If the backend name is unknown or Redis has no URL
+    """
+    backend = settings.RESPONSE_CACHE_BACKEND
+    if backend == "none":
+        return None
+    if backend == "memory":
+        workers = os.environ.get("WEB_CONCURRENCY", "1")
+        if workers.isdigit() and int(workers) > 1:
+            logger.warning(
+                f"Memory response cache with {workers} workers: other workers may serve pages "
+                f"up to {settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS}s older than a write; "
+                f"use RESPONSE_CACHE_BACKEND=redis to share invalidations"
+            )
+        return MemoryCacheBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if backend == "redis":
+        if not settings.RESPONSE_CACHE_URL:
+            raise ValueError("RESPONSE_CACHE_URL must be set for the redis response cache")
+        return RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND '{backend}'")
+
+
+book_response_cache = ResponseCache(
+    backend=create_cache_backend(),
+    ttl_seconds=(settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS if settings.RESPONSE_CACHE_BACKEND == "memory"
+                 else settings.RESPONSE_CACHE_TTL_SECONDS),
+    namespace="books",
+    replica_lag_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
@@ -9,19 +9,71 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./book_management.db"
+    ASYNC_DATABASE: bool = False  # Use AsyncSession (aiosqlite/asyncpg) for request handling
+    ASYNC_DATABASE_URL: Optional[str] = None  # Derived from DATABASE_URL when not set
+    DB_POOL_SIZE: int = 5  # Connections kept open per engine (per worker process)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load beyond DB_POOL_SIZE
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Reconnect connections older than this many seconds (-1 disables)
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout and replace dead ones
+    DATABASE_READ_URLS: Optional[str] = None  # Comma-separated read replica URLs for read-only endpoints
+    READ_REPLICA_RETRY_SECONDS: float = 30.0  # How long an unreachable replica is skipped
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # After a write, the client's reads use the primary this long
+    SQL_ECHO: bool = False  # Log every SQL statement (slow; independent of DEBUG)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Log statements slower than this (0 disables)
+    DB_QUERY_HEADERS: bool = True  # Add X-DB-Queries and Server-Timing headers to responses
+    DB_QUERY_BUDGET: int = 0  # Statements allowed per request before a warning (0 disables)
+    DB_QUERY_BUDGETS: Dict[str, int] = {}  # Per-route budgets keyed "METHOD /route/template"
+    DB_QUERY_BUDGET_STRICT: bool = False  # Fail requests over budget instead of warning (tests/CI)
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dedicated to bcrypt hashing/verification
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting hash calls before answering 429
+    AUTH_CACHE_TTL_SECONDS: int = 60  # Token -> user snapshot cache lifetime (0 disables)
+    AUTH_CACHE_MAX_SIZE: int = 10000  # Maximum cached tokens per worker
+
+    # Admission control (per worker process)
+    ADMISSION_CONTROL: bool = True  # Bound concurrent API requests per route class and shed the excess
+    ADMISSION_LIMITS: Dict[str, int] = {}  # Concurrent requests per class (0: unlimited); unset classes follow the DB pool size
+    ADMISSION_MAX_QUEUE: int = 64  # Requests waiting per class before answering 503
+    ADMISSION_MAX_WAIT_SECONDS: float = 2.0  # Longest queueing; longer expected waits are rejected at once
+    RATE_LIMIT_PER_SECOND: float = 0.0  # Sustained requests per user (client IP when anonymous; 0 disables)
+    RATE_LIMIT_BURST: int = 50  # Requests a client may send at once above the sustained rate
 
     # Application
     APP_NAME: str = "Book Management System"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
+    LOG_FORMAT: str = "text"  # text or json (one JSON object per line)
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the log writer thread; extra records are dropped
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0  # Fraction of successful requests whose request/response logs are kept
+    LOG_SKIP_RECORD_METADATA: bool = False  # Skip caller/process lookups per record (process-wide logging flags)
+
+    # Bulk import and export
+    BOOK_IMPORT_BATCH_SIZE: int = 5000  # Records validated and inserted per batch
+    BOOK_IMPORT_MAX_ERRORS: int = 1000  # Row errors listed in an import response
+    BOOK_IMPORT_USE_COPY: bool = True  # Use COPY for inserts on PostgreSQL
+    BOOK_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the cursor per export chunk
+
+    # Response cache for catalog reads
+    RESPONSE_CACHE_BACKEND: str = "memory"  # memory, redis or none
+    RESPONSE_CACHE_URL: Optional[str] = None  # e.g. redis://localhost:6379/0 for the redis backend
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # Redis backend, invalidated across workers
+    # Memory backend: other workers only see a write's invalidation once their entries expire,
+    # so this bounds how stale they can be
+    RESPONSE_CACHE_MEMORY_TTL_SECONDS: int = 5
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000  # Per worker, memory backend only
+    READ_COALESCING: bool = True  # Identical concurrent catalog reads share one database call
+
+    # Reading statistics
+    READING_STATS_COUNTERS: bool = False  # Maintain user_reading_stats rows for O(1) /users/me/stats
 
     # API
     API_V1_STR: str = "/api/v1"
+    FAST_JSON_RESPONSES: bool = False  # Serve list endpoints from projected rows encoded with orjson
 
     @field_validator("SECRET_KEY")
     @classmethod
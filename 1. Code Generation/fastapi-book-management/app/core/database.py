@@ -1,33 +1,182 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Tuple, Type, TypeVar, Union
 import logging
+import time
 
 from .config import get_settings
+from .metrics import registry
+from .search import ensure_search_index
 from ..models.base import Base
 
+T = TypeVar("T")
+
 # Get settings
 settings = get_settings()
 
+# Async driver used for each database backend when ASYNC_DATABASE is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+# Connection pool metrics, labelled with the pool name ("sync" or "async")
+POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+POOL_OVERFLOW_EVENTS = registry.counter(
+    "db_pool_overflow_total", "Connections opened beyond the pool size", ["pool"]
+)
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["pool"]
+)
+
+# Pools to report gauges for, by name
+_instrumented_pools: Dict[str, Pool] = {}
+
+
+def _pool_gauge(read: Callable[[QueuePool], int]) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    return lambda: {(name,): read(pool) for name, pool in _instrumented_pools.items()}
+
+
+registry.gauge("db_pool_size", "Configured pool size", ["pool"], _pool_gauge(lambda pool: pool.size()))
+registry.gauge("db_pool_checked_out", "Connections currently checked out", ["pool"],
+               _pool_gauge(lambda pool: pool.checkedout()))
+registry.gauge("db_pool_checked_in", "Idle connections in the pool", ["pool"],
+               _pool_gauge(lambda pool: pool.checkedin()))
+registry.gauge("db_pool_overflow", "Overflow connections currently open", ["pool"],
+               _pool_gauge(lambda pool: max(pool.overflow(), 0)))
+
+
+def instrumented_pool_class(base: Type[QueuePool], name: str) -> Type[QueuePool]:
+    """
+    Build a queue pool class that records checkout waits, overflows and timeouts.
+
+    Args:
+        base: QueuePool or AsyncAdaptedQueuePool
+        name: Pool label used in the metrics
+
+    Returns:
+        Type[QueuePool]: The instrumented pool class
+    """
+    labels = (name,)
+
+    class InstrumentedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            _instrumented_pools[name] = self
+
+        def _do_get(self):
+            overflow = self._overflow
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                POOL_TIMEOUTS.inc(labels=labels)
+                raise
+            finally:
+                POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, labels)
+            if self._overflow > max(overflow, 0):
+                POOL_OVERFLOW_EVENTS.inc(labels=labels)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def get_pool_options(database_url: str, pool_class: Type[QueuePool], name: str) -> Dict[str, Any]:
+    """
+    Engine pool arguments from the DB_POOL_* settings.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool, since
+    every new connection would open a different empty database.
+
+    Args:
+        database_url: Database URL of the engine
+        pool_class: Queue pool class of the engine (sync or async)
+        name: Pool label used in the metrics
+
+    Returns:
+        dict: Keyword arguments for create_engine / create_async_engine
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": instrumented_pool_class(pool_class, name),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
+    echo=settings.SQL_ECHO,  # Log every SQL statement (not tied to DEBUG)
+    **get_pool_options(settings.DATABASE_URL, QueuePool, "sync"),
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create SessionLocal class; like AsyncSessionLocal, objects keep their state after
+# commit (server-generated columns come back through RETURNING, see eager_defaults)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Handlers come from setup_logging() in app.core.logging
 logger = logging.getLogger(__name__)
 
 
+def get_async_database_url(database_url: str) -> str:
+    """
+    Derive the asyncio driver URL from a synchronous database URL.
+
+    Args:
+        database_url: Synchronous database URL (e.g. ``postgresql://...``)
+
+    Returns:
+        str: The same URL using the async driver (aiosqlite or asyncpg)
+
+    Raises:
+        ValueError: If no async driver is known for the database backend
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+# Create the async engine and AsyncSessionLocal class when async mode is enabled
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DATABASE:
+    async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=settings.SQL_ECHO,
+        **get_pool_options(async_database_url, AsyncAdaptedQueuePool, "async"),
+    )
+    # Objects stay usable after commit; lazy refreshes would need a greenlet context
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def create_tables():
     """Create all database tables."""
     try:
         Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -49,4 +198,70 @@ def get_db() -> Generator[Session, None, None]:
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency for FastAPI.
+
+    Yields:
+        AsyncSession: SQLAlchemy asyncio database session
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database error: {e}")
+            await db.rollback()
+            raise
+
+
+# Session dependency used by the request handlers, selected by ASYNC_DATABASE
+get_session = get_async_db if settings.ASYNC_DATABASE else get_db
+
+
+@asynccontextmanager
+async def open_session() -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    """
+    Open a session that is not tied to a request dependency.
+
+    Used by streaming responses, whose body is produced after the handler
+    has returned and must own its session for as long as it runs.
+
+    Yields:
+        Session or AsyncSession: Session selected by the ASYNC_DATABASE setting
+    """
+    if settings.ASYNC_DATABASE:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def run_in_session(db: Union[Session, AsyncSession], fn: Callable[..., T],
+                         *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous ORM code against a session without blocking the event loop.
+
+    With an ``AsyncSession`` the function runs through ``run_sync`` so every
+    round trip is awaited on the async driver; with a plain ``Session`` it is
+    moved to the threadpool.
+
+    Args:
+        db: Sync or async database session
+        fn: Callable receiving a synchronous ``Session`` as first argument
+        *args: Extra positional arguments for ``fn``
+        **kwargs: Extra keyword arguments for ``fn``
+
+    Returns:
+        The return value of ``fn``
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
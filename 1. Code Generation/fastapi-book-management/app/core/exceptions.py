@@ -82,6 +82,16 @@ def create_authorization_exception(detail: str = "Not enough permissions") -> HT
     )
 
 
+def create_too_many_requests_exception(detail: str = "Too many requests",
+                                       retry_after: int = 1) -> HTTPException:
+    """Create a 429 Too Many Requests HTTPException."""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
 def create_internal_server_exception(detail: str = "Internal server error") -> HTTPException:
     """Create a 500 Internal Server Error HTTPException."""
     return HTTPException(
@@ -1,16 +1,39 @@
 """
 Logging configuration for the book management application.
+
+Records are handed to a bounded queue by a ``QueueHandler`` and formatted and
+written to stdout by a background ``QueueListener``, so request handlers never
+block on I/O. ``LOG_FORMAT=json`` emits one JSON object per line with the
+structured fields of the helper functions below as top-level keys.
 """
 
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
 
 from ..core.config import get_settings
+from .metrics import registry
 
 settings = get_settings()
 
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"
+)
+
+# Background listener writing queued records, started by setup_logging()
+_listener: Optional[logging.handlers.QueueListener] = None
+# Handler installed on the root logger by setup_logging(), replaced on each call
+_queue_handler: Optional[logging.Handler] = None
+
 
 class ColorFormatter(logging.Formatter):
     """Custom formatter with color codes for different log levels."""
@@ -29,46 +52,145 @@ class ColorFormatter(logging.Formatter):
         logging.CRITICAL: bold_red
     }
 
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+        # One formatter per level, built once instead of for every record
+        self._formatters = {
+            level: StructuredTextFormatter(f"{color}{TEXT_FORMAT}{self.reset}")
+            for level, color in self.COLORS.items()
+        }
+        self._default = StructuredTextFormatter(TEXT_FORMAT)
+
     def format(self, record):
-        log_color = self.COLORS.get(record.levelno)
-        formatter = logging.Formatter(
-            f"{log_color}%(asctime)s - %(name)s - %(levelname)s - %(message)s{self.reset}"
-        )
-        return formatter.format(record)
+        return self._formatters.get(record.levelno, self._default).format(record)
+
+
+class StructuredTextFormatter(logging.Formatter):
+    """Text formatter appending a record's structured ``fields`` to its message."""
+
+    def format(self, record):
+        fields = getattr(record, "fields", None)
+        if fields:
+            record = copy.copy(record)
+            record.msg = f"{record.getMessage()}: {fields}"
+            record.args = None
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter writing each record as a single-line JSON object."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a ``SimpleQueue`` that drops records once ``max_size`` are waiting.
+
+    ``SimpleQueue`` puts are a single C call without a Python-level lock, which
+    keeps the cost on the logging thread low; the size check is approximate,
+    which is fine for a bound meant to protect memory.
+    """
+
+    def __init__(self, log_queue: "queue.SimpleQueue[logging.LogRecord]", max_size: int):
+        super().__init__(log_queue)
+        self.max_size = max_size
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size:
+            LOG_RECORDS_DROPPED.inc()
+            return
+        self.queue.put_nowait(record)
+
+    def prepare(self, record):
+        # Only merge the message arguments, in place; tracebacks and the final
+        # layout are formatted by the listener thread, off the request path
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def create_formatter() -> logging.Formatter:
+    """Formatter selected by LOG_FORMAT (and DEBUG for colored text)."""
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    if settings.DEBUG:
+        return ColorFormatter()
+    return StructuredTextFormatter(TEXT_FORMAT)
 
 
 def setup_logging() -> None:
     """Set up application logging configuration."""
+    global _listener, _queue_handler
 
     # Set log level based on debug setting
     log_level = logging.DEBUG if settings.DEBUG else logging.INFO
 
+    # Records are written to stdout by a background listener thread
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(create_formatter())
+
+    shutdown_logging()
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, console_handler)
+    _listener.start()
+    queue_handler = DroppingQueueHandler(log_queue, settings.LOG_QUEUE_SIZE)
+
+    if settings.LOG_SKIP_RECORD_METADATA:
+        # None of the formats show source locations or process names; skip
+        # collecting them for every record (see "Optimization" in the logging docs).
+        # These are process-wide logging module flags, hence opt-in
+        logging._srcfile = None
+        logging.logMultiprocessing = False
+        logging.logProcesses = False
+
+    # Every application logger goes through the queue via the root logger.
+    # Only the handler installed by a previous call is replaced; handlers
+    # added by the server or the embedding application are left alone
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    _queue_handler = queue_handler
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+
     # Create logger
     logger = logging.getLogger("book_management")
     logger.setLevel(log_level)
+    logger.propagate = True
 
-    # Remove existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
 
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
 
-    # Set formatter
-    if settings.DEBUG:
-        console_handler.setFormatter(ColorFormatter())
-    else:
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        console_handler.setFormatter(formatter)
 
-    # Add handler to logger
-    logger.addHandler(console_handler)
+def sample_request_log() -> bool:
+    """
+    Decide whether a request's logs are written under LOG_REQUEST_SAMPLE_RATE.
 
-    # Prevent propagation to root logger
-    logger.propagate = False
+    Failed requests are always logged by the caller regardless of sampling.
+    """
+    rate = settings.LOG_REQUEST_SAMPLE_RATE
+    return rate >= 1.0 or random.random() < rate
 
 
 def get_logger(name: str = "book_management") -> logging.Logger:
@@ -76,36 +198,39 @@ def get_logger(name: str = "book_management") -> logging.Logger:
     return logging.getLogger(name)
 
 
+_api_logger = get_logger("api")
+_slow_query_logger = get_logger("database.slow_query")
+_query_budget_logger = get_logger("database.query_budget")
+
+
 def log_api_request(method: str, path: str, user_id: int = None, **kwargs) -> None:
     """Log API request information."""
-    logger = get_logger("api")
+    logger = _api_logger
 
     log_data = {
         "method": method,
         "path": path,
-        "timestamp": datetime.utcnow().isoformat(),
         "user_id": user_id,
         **kwargs
     }
 
-    logger.info(f"API Request: {log_data}")
+    logger.info("API Request", extra={"fields": log_data})
 
 
 def log_api_response(method: str, path: str, status_code: int,
                     processing_time: float = None, **kwargs) -> None:
     """Log API response information."""
-    logger = get_logger("api")
+    logger = _api_logger
 
     log_data = {
         "method": method,
         "path": path,
         "status_code": status_code,
         "processing_time": processing_time,
-        "timestamp": datetime.utcnow().isoformat(),
         **kwargs
     }
 
-    logger.info(f"API Response: {log_data}")
+    logger.info("API Response", extra={"fields": log_data})
 
 
 def log_database_operation(operation: str, table: str, success: bool,
@@ -118,14 +243,65 @@ def log_database_operation(operation: str, table: str, success: bool,
         "table": table,
         "success": success,
         "error": error,
-        "timestamp": datetime.utcnow().isoformat(),
         **kwargs
     }
 
     if success:
-        logger.info(f"Database Operation: {log_data}")
+        logger.info("Database Operation", extra={"fields": log_data})
     else:
-        logger.error(f"Database Operation Failed: {log_data}")
+        logger.error("Database Operation Failed", extra={"fields": log_data})
+
+
+def describe_parameters(parameters: Any, executemany: bool = False) -> str:
+    """
+    Describe the shape of statement parameters without their values.
+
+    Values are never logged: they may hold personal data or password hashes.
+
+    Args:
+        parameters: DBAPI parameters of the statement
+        executemany: Whether ``parameters`` is a sequence of parameter sets
+
+    Returns:
+        str: e.g. ``"(int, str)"``, ``"{title: str, isbn: NoneType}"`` or ``"500 x (int, str)"``
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = describe_parameters(parameters[0]) if parameters else "()"
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def log_slow_query(statement: str, duration: float, parameters: Any = None,
+                   executemany: bool = False, route: Optional[str] = None) -> None:
+    """Log a database statement that exceeded SLOW_QUERY_THRESHOLD_MS."""
+    logger = _slow_query_logger
+
+    log_data = {
+        "duration_ms": round(duration * 1000, 2),
+        "statement": " ".join(statement.split())[:2000],
+        "parameters": describe_parameters(parameters, executemany),
+        "route": route,
+    }
+
+    logger.warning("Slow Query", extra={"fields": log_data})
+
+
+def log_query_budget_exceeded(route: str, queries: int, budget: int, db_seconds: float) -> None:
+    """Log a request that issued more statements than its query budget."""
+    logger = _query_budget_logger
+
+    log_data = {
+        "route": route,
+        "queries": queries,
+        "budget": budget,
+        "db_duration_ms": round(db_seconds * 1000, 2),
+    }
+
+    logger.warning("Query Budget Exceeded", extra={"fields": log_data})
 
 
 def log_authentication_event(event_type: str, username: str, success: bool,
@@ -138,15 +314,15 @@ def log_authentication_event(event_type: str, username: str, success: bool,
         "username": username,
         "success": success,
         "reason": reason,
-        "timestamp": datetime.utcnow().isoformat(),
         **kwargs
     }
 
     if success:
-        logger.info(f"Authentication Event: {log_data}")
+        logger.info("Authentication Event", extra={"fields": log_data})
     else:
-        logger.warning(f"Authentication Failed: {log_data}")
+        logger.warning("Authentication Failed", extra={"fields": log_data})
 
 
 # Initialize logging
-setup_logging()
\ No newline at end of file
+setup_logging()
+atexit.register(shutdown_logging)
\ No newline at end of file
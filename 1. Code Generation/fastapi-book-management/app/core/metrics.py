@@ -0,0 +1,214 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Metrics are updated from the event loop and from threadpool workers. To keep
+the hot path free of locks, every thread accumulates into its own shard
+(a ``threading.local`` dict) and a scrape sums the shards. A lock is only
+taken the first time a thread touches a metric, to register its shard.
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Labels = Tuple[str, ...]
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Shards:
+    """Per-thread accumulators of one metric, keyed by label values."""
+
+    def __init__(self, factory: Callable[[], List[float]]):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, List[float]]] = []
+        self._lock = threading.Lock()
+
+    def values(self, labels: Labels) -> List[float]:
+        """Return the calling thread's accumulator for ``labels``."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = self._factory()
+        return values
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        """Sum the accumulators of every thread."""
+        with self._lock:
+            shards = list(self._shards)
+        totals: Dict[Labels, List[float]] = {}
+        for shard in shards:
+            for labels, values in list(shard.items()):
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+        return totals
+
+
+class Metric(ABC):
+    """Base class of the registered metrics."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        yield from self.samples()
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Yield the exposition lines of the metric's samples."""
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._shards = _Shards(lambda: [0.0])
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self._shards.values(labels)[0] += amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, (value,) in sorted(self._shards.collect().items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down.
+
+    Either adjusted with ``inc``/``dec`` or read from ``function`` at scrape
+    time; the function returns a mapping of label values to values.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 function: Optional[Callable[[], Dict[Labels, float]]] = None):
+        super().__init__(name, documentation, label_names)
+        self.function = function
+        self._shards = _Shards(lambda: [0.0])
+
+    def inc(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self._shards.values(labels)[0] += amount
+
+    def dec(self, amount: float = 1.0, labels: Labels = ()) -> None:
+        self._shards.values(labels)[0] -= amount
+
+    def samples(self) -> Iterable[str]:
+        if self.function is not None:
+            values = self.function()
+        else:
+            values = {labels: value for labels, (value,) in self._shards.collect().items()}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per bucket counts (non-cumulative), then the sum and the count
+        size = len(self.buckets) + 2
+        self._shards = _Shards(lambda: [0.0] * size)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        values = self._shards.values(labels)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                values[index] += 1
+                break
+        values[-2] += value
+        values[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        for labels, values in sorted(self._shards.collect().items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {_format_value(cumulative)}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {_format_value(values[-1])}"
+            yield f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(values[-2])}"
+            yield f"{self.name}_count{_format_labels(self.label_names, labels)} {_format_value(values[-1])}"
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together by the metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = (),
+              function: Optional[Callable[[], Dict[Labels, float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names, function))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
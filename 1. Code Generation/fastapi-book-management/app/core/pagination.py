@@ -0,0 +1,167 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens carrying the sort order they were issued
+for and the ``(sort_key, id)`` values of the last row of the previous page.
+The next page is fetched with a seek predicate on those values instead of
+``OFFSET``, so the cost of a page does not grow with its depth.
+"""
+
+import base64
+import json
+from typing import Any, List, NamedTuple, Optional
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+from .exceptions import ValidationError
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """
+    Encode a pagination cursor.
+
+    Args:
+        sort: Sort order the cursor belongs to (e.g. ``"-title"``)
+        values: Seek values of the last row of the page
+
+    Returns:
+        str: Opaque URL-safe cursor
+    """
+    payload = json.dumps({"s": sort, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """
+    Decode a pagination cursor issued for ``sort``.
+
+    Args:
+        cursor: Cursor returned as ``next_cursor`` by a previous page
+        sort: Sort order of the current request
+
+    Returns:
+        List[Any]: Seek values of the last row of the previous page
+
+    Raises:
+        ValidationError: If the cursor is malformed or was issued for another sort order
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_sort, values = payload["s"], payload["v"]
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError("Invalid pagination cursor")
+
+    if cursor_sort != sort or not isinstance(values, list):
+        raise ValidationError("Pagination cursor does not match the requested sort order")
+    return values
+
+
+class Page(NamedTuple):
+    """One page of results with its continuation cursor and optional total."""
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+
+# How the total row count of a paginated listing is computed
+TOTAL_MODES = ("exact", "estimated", "none")
+TOTAL_PATTERN = "^(" + "|".join(TOTAL_MODES) + ")$"
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    Ask the PostgreSQL planner for the row estimate of ``query``.
+
+    Args:
+        query: ORM query to estimate
+
+    Returns:
+        Optional[int]: Estimated row count, or None if the backend gives no estimate
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+
+    # Keep the filter values bound: rendered as literals they would be parsed
+    # again as SQL, where a value such as ":name" reads as a bind parameter
+    compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+    parameters = compiled.params
+    if compiled.positional:
+        parameters = tuple(parameters[name] for name in compiled.positiontup)
+    connection = query.session.connection()
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def keyset_paginate(query: Query, sort: str, sort_column: InstrumentedAttribute,
+                    id_column: InstrumentedAttribute, cursor: Optional[str] = None,
+                    limit: int = 100, total: str = "none") -> Page:
+    """
+    Fetch one page of ``query`` ordered and seeked on ``(sort_column, id_column)``.
+
+    The total is only computed for the first page (no cursor); later pages
+    report None, so walking a large listing does not count it again on every
+    page. With ``total="exact"`` it comes from the same statement as the rows,
+    via a ``count(*) OVER ()`` column. With ``total="estimated"`` the planner
+    estimate is used where available (PostgreSQL), falling back to the exact
+    count elsewhere.
+
+    Args:
+        query: Filtered ORM query returning entities with both columns as attributes
+        sort: Sort order, a column name optionally prefixed with ``-`` for descending
+        sort_column: Column to order by
+        id_column: Unique tie-breaker column
+        cursor: Cursor of the previous page, None for the first page
+        limit: Maximum number of rows to return
+        total: One of TOTAL_MODES
+
+    Returns:
+        Page: The page rows, the cursor of the next page (None when this is the
+        last page) and the total when requested on the first page
+
+    Raises:
+        ValidationError: If the cursor is invalid
+    """
+    descending = sort.startswith("-")
+    columns = [sort_column] if sort_column is id_column else [sort_column, id_column]
+
+    if cursor:
+        total = "none"
+
+    total_count = None
+    total_estimated = False
+    if total == "estimated":
+        total_count = estimate_count(query)
+        total_estimated = total_count is not None
+    with_total = total != "none" and total_count is None
+
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        if len(values) != len(columns):
+            raise ValidationError("Invalid pagination cursor")
+        seek = tuple_(*columns)
+        bound = tuple_(*values)
+        query = query.filter(seek < bound if descending else seek > bound)
+    elif with_total:
+        query = query.add_columns(func.count().over())
+
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    if with_total:
+        total_count = rows[0][1] if rows else 0
+        rows = [row[0] for row in rows]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, column.key) for column in columns])
+
+    return Page(items=rows, next_cursor=next_cursor, total=total_count, total_estimated=total_estimated)
@@ -0,0 +1,299 @@
+"""
+Read-replica routing for read-only endpoints.
+
+With ``DATABASE_READ_URLS`` set, ``get_read_session`` hands out sessions on
+the replicas in round-robin order. A replica that refuses connections (or
+drops one mid-query) is skipped for ``READ_REPLICA_RETRY_SECONDS``; when no
+replica is available the primary is used. Without replicas the dependency is
+simply ``get_session``.
+
+Read-your-writes: a successful catalog or reading-status write marks the
+client for ``READ_YOUR_WRITES_SECONDS`` (a cookie, plus the bearer token in
+this worker), and its reads go to the primary during that window so it never
+reads data older than its own write from a lagging replica. Other non-safe
+requests, such as logging in, write nothing the replicas serve and do not
+pin the client.
+"""
+
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Iterator, List, Optional, Tuple, Union
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .database import get_async_database_url, get_async_db, get_db, get_pool_options, get_session
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+READ_URLS: List[str] = [url.strip() for url in (settings.DATABASE_READ_URLS or "").split(",") if url.strip()]
+
+# Cookie set after a successful write; its presence routes reads to the primary
+READ_PRIMARY_COOKIE = "read_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Paths whose writes change data read from the replicas: the catalog and reading statuses
+READ_YOUR_WRITES_PREFIXES = (
+    f"{settings.API_V1_STR}/books",
+    f"{settings.API_V1_STR}/users/books/",
+    f"{settings.API_V1_STR}/users/me/books/",
+)
+
+
+class ReplicaSet:
+    """
+    Round-robin selection over replicas with time-based failover.
+
+    Args:
+        engines: Engine (or AsyncEngine) per replica
+        sessionmakers: Session factory per replica
+        names: Replica names used in logs and stats
+        retry_seconds: How long a failed replica is skipped
+    """
+
+    def __init__(self, engines: List[Any], sessionmakers: List[Callable[[], Any]], names: List[str],
+                 retry_seconds: float):
+        self.engines = engines
+        self.sessionmakers = sessionmakers
+        self.names = names
+        self.retry_seconds = retry_seconds
+        self.failovers = 0
+        self._next = itertools.count()
+        self._down_until = [0.0] * len(sessionmakers)
+
+    def candidates(self) -> Iterator[int]:
+        """Yield the indexes of available replicas, starting with the next in turn."""
+        count = len(self.sessionmakers)
+        start = next(self._next) % count
+        now = time.monotonic()
+        for offset in range(count):
+            index = (start + offset) % count
+            if self._down_until[index] <= now:
+                yield index
+
+    def mark_down(self, index: int, error: Exception) -> None:
+        """Take a replica out of rotation for ``retry_seconds``."""
+        if self._down_until[index] <= time.monotonic():
+            logger.warning(f"Read replica {self.names[index]} unavailable, skipping for "
+                           f"{self.retry_seconds}s: {error}")
+        self._down_until[index] = time.monotonic() + self.retry_seconds
+        self.failovers += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return availability of each replica and the failover count."""
+        now = time.monotonic()
+        return {
+            "replicas": {name: self._down_until[index] <= now for index, name in enumerate(self.names)},
+            "failovers": self.failovers,
+        }
+
+    async def dispose(self) -> None:
+        """Close the connection pools of every replica."""
+        for replica_engine in self.engines:
+            if isinstance(replica_engine, AsyncEngine):
+                await replica_engine.dispose()
+            else:
+                replica_engine.dispose()
+
+
+class ReadYourWritesTracker:
+    """Bearer tokens that wrote recently, so their reads stay on the primary."""
+
+    def __init__(self, window_seconds: float, max_size: int = 10000):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._pinned: "OrderedDict[str, float]" = OrderedDict()
+
+    def pin(self, token: str) -> None:
+        self._pinned[token] = time.monotonic() + self.window_seconds
+        self._pinned.move_to_end(token)
+        while len(self._pinned) > self.max_size:
+            self._pinned.popitem(last=False)
+
+    def is_pinned(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        until = self._pinned.get(token)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._pinned.pop(token, None)
+            return False
+        return True
+
+
+def _create_replica_set() -> Optional[ReplicaSet]:
+    if not READ_URLS:
+        return None
+
+    engines: List[Any] = []
+    sessionmakers: List[Callable[[], Any]] = []
+    names = [f"replica{index}" for index in range(len(READ_URLS))]
+    for name, url in zip(names, READ_URLS):
+        if settings.ASYNC_DATABASE:
+            async_url = get_async_database_url(url)
+            replica_engine = create_async_engine(
+                async_url, echo=settings.SQL_ECHO,
+                **get_pool_options(async_url, AsyncAdaptedQueuePool, f"async-{name}"),
+            )
+            sync_engine = replica_engine.sync_engine
+            sessionmakers.append(async_sessionmaker(
+                replica_engine, autoflush=False, expire_on_commit=False, info={"replica": name}
+            ))
+        else:
+            replica_engine = sync_engine = create_engine(
+                url,
+                connect_args={"check_same_thread": False} if "sqlite" in url else {},
+                echo=settings.SQL_ECHO,
+                **get_pool_options(url, QueuePool, name),
+            )
+            # Same session semantics as SessionLocal: objects keep their state after commit
+            sessionmakers.append(sessionmaker(
+                autocommit=False, autoflush=False, bind=sync_engine, expire_on_commit=False,
+                info={"replica": name}
+            ))
+        engines.append(replica_engine)
+        _watch_disconnects(sync_engine, len(engines) - 1)
+
+    return ReplicaSet(engines, sessionmakers, names, settings.READ_REPLICA_RETRY_SECONDS)
+
+
+def _watch_disconnects(sync_engine, index: int) -> None:
+    """Take a replica out of rotation when one of its connections drops mid-request."""
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(context):
+        if context.is_disconnect and replica_set is not None:
+            replica_set.mark_down(index, context.original_exception)
+
+
+replica_set: Optional[ReplicaSet] = _create_replica_set()
+read_your_writes = ReadYourWritesTracker(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def _bearer_token(headers: Headers) -> Optional[str]:
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+def read_from_primary(request: Request) -> bool:
+    """Whether the client wrote recently and must read from the primary."""
+    return READ_PRIMARY_COOKIE in request.cookies or read_your_writes.is_pinned(_bearer_token(request.headers))
+
+
+def is_replica_session(db: Union[Session, AsyncSession]) -> bool:
+    """Whether a session is bound to a read replica."""
+    return "replica" in db.info
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Read-only database dependency: a replica session, or the primary as fallback.
+
+    Yields:
+        Session: SQLAlchemy session on a replica or on the primary
+    """
+    if replica_set is None or read_from_primary(request):
+        yield from get_db()
+        return
+
+    for index in replica_set.candidates():
+        db = replica_set.sessionmakers[index]()
+        try:
+            # Check a connection out now so an unreachable replica fails over here
+            db.connection()
+        except DBAPIError as e:
+            db.close()
+            replica_set.mark_down(index, e)
+            continue
+
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Database error on read replica: {e}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return
+
+    yield from get_db()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async read-only database dependency: a replica session, or the primary as fallback.
+
+    Yields:
+        AsyncSession: SQLAlchemy asyncio session on a replica or on the primary
+    """
+    if replica_set is not None and not read_from_primary(request):
+        for index in replica_set.candidates():
+            async with replica_set.sessionmakers[index]() as db:
+                try:
+                    await db.connection()
+                except DBAPIError as e:
+                    replica_set.mark_down(index, e)
+                    continue
+
+                try:
+                    yield db
+                except Exception as e:
+                    logger.error(f"Database error on read replica: {e}")
+                    await db.rollback()
+                    raise
+                return
+
+    async for db in get_async_db():
+        yield db
+
+
+# Read-only session dependency; plain get_session when no replica is configured
+if replica_set is None:
+    get_read_session = get_session
+else:
+    get_read_session = get_async_read_db if settings.ASYNC_DATABASE else get_read_db
+
+
+class ReadYourWritesMiddleware:
+    """
+    Mark clients after a successful write so their next reads use the primary.
+
+    Args:
+        app: ASGI application to wrap
+        prefixes: Paths whose non-safe requests pin the client to the primary
+    """
+
+    def __init__(self, app: ASGIApp, prefixes: Tuple[str, ...] = READ_YOUR_WRITES_PREFIXES):
+        self.app = app
+        self.prefixes = prefixes
+        self.cookie = (
+            f"{READ_PRIMARY_COOKIE}=1; Max-Age={int(settings.READ_YOUR_WRITES_SECONDS)}; "
+            "Path=/; HttpOnly; SameSite=Lax"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] in SAFE_METHODS
+                or not scope["path"].startswith(self.prefixes)):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", self.cookie)
+                token = _bearer_token(Headers(scope=scope))
+                if token:
+                    read_your_writes.pin(token)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
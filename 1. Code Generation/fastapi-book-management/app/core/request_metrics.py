@@ -0,0 +1,198 @@
+"""
+HTTP request metrics and per-request database accounting.
+
+``MetricsMiddleware`` is a plain ASGI middleware: it times every request and
+labels it with the matched route template (``/api/v1/books/{book_id}``), not
+the raw path, so the number of series stays bounded. A ``RequestStats``
+object is placed in a context variable for the duration of the request;
+SQLAlchemy cursor events add each statement's count and duration to it. The
+object is shared by reference, so statements run from the threadpool or from
+``AsyncSession.run_sync`` (which copy the context) are accounted to the
+request that issued them. The same listener logs statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` together with the route that issued them.
+
+When the response starts, the statements issued so far are reported in the
+``X-DB-Queries`` and ``Server-Timing`` headers and checked against the route's
+query budget, which catches N+1 queries from lazy loads during serialization.
+Over budget, the request is logged and counted, or, with
+``DB_QUERY_BUDGET_STRICT``, fails with ``QueryBudgetExceeded`` so a test suite
+run in strict mode breaks on the offending route.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+from .logging import log_query_budget_exceeded, log_slow_query
+from .metrics import registry
+
+settings = get_settings()
+
+# Statements at least this slow are logged; None disables the slow-query log
+SLOW_QUERY_SECONDS = settings.SLOW_QUERY_THRESHOLD_MS / 1000 if settings.SLOW_QUERY_THRESHOLD_MS > 0 else None
+
+# Label of requests that did not match any route
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ["method", "route"]
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "Database statements executed per HTTP request",
+    ["method", "route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+HTTP_REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds", "Time spent in database statements per HTTP request",
+    ["method", "route"]
+)
+DB_QUERIES = registry.counter(
+    "db_queries_total", "Database statements executed"
+)
+DB_SLOW_QUERIES = registry.counter(
+    "db_slow_queries_total", "Database statements slower than SLOW_QUERY_THRESHOLD_MS"
+)
+HTTP_QUERY_BUDGET_EXCEEDED = registry.counter(
+    "http_request_query_budget_exceeded_total", "HTTP requests that issued more statements than their budget",
+    ["method", "route"]
+)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request issues more statements than its budget."""
+    pass
+
+
+@dataclass
+class RequestStats:
+    """Database work done on behalf of one request."""
+    scope: Optional[Scope] = None
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    """Return the stats of the current request, None outside a request."""
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started_at
+    DB_QUERIES.inc()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += duration
+
+    if SLOW_QUERY_SECONDS is not None and duration >= SLOW_QUERY_SECONDS:
+        DB_SLOW_QUERIES.inc()
+        route = None
+        if stats is not None and stats.scope is not None:
+            route = f"{stats.scope['method']} {route_template(stats.scope)}"
+        log_slow_query(statement, duration, parameters, executemany, route)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route matched for ``scope``."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def query_budget(method: str, route: str) -> int:
+    """Statement budget of a route: its ``DB_QUERY_BUDGETS`` entry or ``DB_QUERY_BUDGET`` (0: none)."""
+    return settings.DB_QUERY_BUDGETS.get(f"{method} {route}", settings.DB_QUERY_BUDGET)
+
+
+def query_headers(stats: RequestStats, elapsed: float) -> List[Tuple[bytes, bytes]]:
+    """``X-DB-Queries`` and ``Server-Timing`` headers for the work done so far."""
+    server_timing = (
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="queries={stats.queries}", '
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+    return [
+        (b"x-db-queries", str(stats.queries).encode()),
+        (b"server-timing", server_timing.encode()),
+    ]
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and database work per route."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                self.check_budget(scope, stats)
+                if settings.DB_QUERY_HEADERS:
+                    elapsed = time.perf_counter() - start
+                    message["headers"] = [*message.get("headers", ()), *query_headers(stats, elapsed)]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+
+            method = scope["method"]
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(labels=(method, route, str(status_code)))
+            HTTP_REQUEST_DURATION.observe(duration, (method, route))
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, (method, route))
+            HTTP_REQUEST_DB_DURATION.observe(stats.db_seconds, (method, route))
+
+    @staticmethod
+    def check_budget(scope: Scope, stats: RequestStats) -> None:
+        """
+        Compare the statements issued so far with the route's budget.
+
+        Raises:
+            QueryBudgetExceeded: If over budget in strict mode
+        """
+        method = scope["method"]
+        route = route_template(scope)
+        budget = query_budget(method, route)
+        if not budget or stats.queries <= budget:
+            return
+
+        HTTP_QUERY_BUDGET_EXCEEDED.inc(labels=(method, route))
+        if settings.DB_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f"{method} {route} issued {stats.queries} queries, budget is {budget}")
+        log_query_budget_exceeded(f"{method} {route}", stats.queries, budget, stats.db_seconds)
@@ -0,0 +1,46 @@
+"""
+Fast JSON responses.
+
+With ``FAST_JSON_RESPONSES`` enabled, list endpoints select plain columns
+instead of ORM entities and return the rows as dicts encoded directly, so
+FastAPI's per-item ``response_model`` validation and ``jsonable_encoder``
+pass are skipped for rows that come straight from the database. The rows
+carry exactly the fields of the endpoint's response model, so the documented
+schema does not change.
+
+Encoding uses ``orjson`` when it is installed and pydantic-core's encoder
+otherwise; both handle datetimes natively and produce the same output as the
+response models.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from .config import get_settings
+
+settings = get_settings()
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` (dicts, lists, datetimes, ...) as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (or pydantic-core)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Encoder used by the fast path, reported by /health
+JSON_ENCODER = "orjson" if orjson is not None else "pydantic-core"
@@ -0,0 +1,131 @@
+"""
+Full-text search over book title, author and genre.
+
+PostgreSQL uses a GIN expression index on a ``tsvector`` (plus ``pg_trgm``
+indexes so the partial-match filters can use an index too); SQLite uses an
+external-content FTS5 table kept in sync by triggers. Both are maintained by
+the database itself, so every write path stays in sync without application
+code. Other backends fall back to ``ILIKE`` matching.
+"""
+
+import logging
+import re
+from typing import List
+
+from sqlalchemy import column, false, func, inspect, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+
+from ..models.book import Book
+
+logger = logging.getLogger(__name__)
+
+# Same expression in the index and in queries, so PostgreSQL can match them
+PG_SEARCH_VECTOR = (
+    "to_tsvector('simple'::regconfig, coalesce({prefix}title, '') || ' ' || "
+    "coalesce({prefix}author, '') || ' ' || coalesce({prefix}genre, ''))"
+)
+
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_books_search_vector ON books USING GIN ({PG_SEARCH_VECTOR.format(prefix='')})",
+]
+
+POSTGRES_TRIGRAM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_books_author_trgm ON books USING GIN (author gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_books_genre_trgm ON books USING GIN (genre gin_trgm_ops)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, author, genre, content='books', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, author, genre) "
+    "VALUES (new.id, new.title, new.author, new.genre); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, genre) "
+    "VALUES ('delete', old.id, old.title, old.author, old.genre); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, genre ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, genre) "
+    "VALUES ('delete', old.id, old.title, old.author, old.genre); "
+    "INSERT INTO books_fts(rowid, title, author, genre) "
+    "VALUES (new.id, new.title, new.author, new.genre); END",
+]
+
+books_fts = table("books_fts", column("rowid"), column("rank"))
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Create the full-text search structures for the engine's dialect.
+
+    Safe to run on every startup; on SQLite the FTS table is back-filled from
+    ``books`` the first time it is created.
+
+    Args:
+        engine: Engine of the primary database
+    """
+    dialect = engine.dialect.name
+
+    if dialect == "sqlite":
+        created = not inspect(engine).has_table("books_fts")
+        with engine.begin() as conn:
+            for statement in SQLITE_SEARCH_DDL:
+                conn.execute(text(statement))
+            if created:
+                conn.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+        logger.info("SQLite FTS5 search index ready")
+
+    elif dialect == "postgresql":
+        with engine.begin() as conn:
+            for statement in POSTGRES_SEARCH_DDL:
+                conn.execute(text(statement))
+        try:
+            with engine.begin() as conn:
+                for statement in POSTGRES_TRIGRAM_DDL:
+                    conn.execute(text(statement))
+        except Exception as e:
+            # pg_trgm needs CREATE privileges; search still works without it
+            logger.warning(f"Trigram indexes not created, partial-match filters will scan: {e}")
+        logger.info("PostgreSQL full-text search indexes ready")
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every word, prefix-matched, all required."""
+    terms: List[str] = re.findall(r"\w+", q, flags=re.UNICODE)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def apply_search(query: Query, q: str, dialect: str, rank: bool = True) -> Query:
+    """
+    Restrict a ``Book`` query to full-text matches of ``q``.
+
+    Args:
+        query: ORM query selecting from ``books``
+        q: Free-text search terms
+        dialect: Database dialect name of the session
+        rank: Order results by relevance (best match first)
+
+    Returns:
+        Query: The filtered (and optionally ranked) query
+    """
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            return query.filter(false())
+        query = query.join(books_fts, books_fts.c.rowid == Book.id).filter(
+            literal_column("books_fts").op("MATCH")(match)
+        )
+        # FTS5's rank is bm25(): lower is a better match
+        return query.order_by(books_fts.c.rank) if rank else query
+
+    if dialect == "postgresql":
+        vector = literal_column(PG_SEARCH_VECTOR.format(prefix="books."))
+        ts_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+        query = query.filter(vector.op("@@")(ts_query))
+        return query.order_by(func.ts_rank(vector, ts_query).desc()) if rank else query
+
+    pattern = f"%{q}%"
+    return query.filter(or_(Book.title.ilike(pattern), Book.author.ilike(pattern), Book.genre.ilike(pattern)))
@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
+import asyncio
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -7,7 +9,10 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from .config import get_settings
-from .database import get_db
+from .database import get_session, run_in_session
+from .auth_cache import AuthenticatedUser, token_user_cache
+from .exceptions import create_too_many_requests_exception
+from .metrics import registry
 from ..models.user import User
 from ..schemas.token import TokenData
 
@@ -20,6 +25,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 # Get settings
 settings = get_settings()
 
+T = TypeVar("T")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -48,6 +55,123 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+
+    bcrypt releases the GIL, so a small thread pool gives real parallelism
+    while keeping the CPU work off the event loop. Admission is bounded: once
+    every worker is busy and ``max_queue`` calls are waiting, new calls are
+    rejected with 429 instead of queueing without limit.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a free worker."""
+        return max(0, self.in_flight - self.workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run ``fn(*args)`` on the pool.
+
+        Args:
+            fn: Blocking hashing function
+            *args: Arguments for ``fn``
+
+        Returns:
+            The return value of ``fn``
+
+        Raises:
+            HTTPException: 429 if the pool and its queue are saturated
+        """
+        # in_flight is only touched from the event loop thread, so no lock is needed
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise create_too_many_requests_exception(
+                "Too many concurrent authentication requests, please retry shortly"
+            )
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+        loop = asyncio.get_running_loop()
+        job = self._executor.submit(fn, *args)
+        self.in_flight += 1
+        # Cancelling the awaiting request does not stop a running bcrypt call, so
+        # the call keeps counting until its thread is done with it
+        job.add_done_callback(lambda _: self._finished(loop))
+        return await asyncio.wrap_future(job)
+
+    def _finished(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Done callbacks run on the worker thread; in_flight belongs to the loop
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return current pool utilisation."""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; the pool restarts lazily on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+registry.gauge("password_hash_in_flight", "Password hashing calls running or queued",
+               function=lambda: {(): password_hash_pool.in_flight})
+registry.gauge("password_hash_queue_depth", "Password hashing calls waiting for a worker",
+               function=lambda: {(): password_hash_pool.queue_depth})
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bounded hashing pool.
+
+    Args:
+        plain_password: The plain text password
+        hashed_password: The hashed password to verify against
+
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the bounded hashing pool.
+
+    Args:
+        password: The plain text password to hash
+
+    Returns:
+        str: The hashed password
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -89,26 +213,39 @@ def verify_token(token: str, credentials_exception: HTTPException) -> TokenData:
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=username, exp=payload.get("exp"))
     except JWTError:
         raise credentials_exception
     return token_data
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _get_user_by_username(db: Session, username: str) -> Optional[User]:
+    """Load a user by username (runs inside ``run_in_session``)."""
+    return db.query(User).filter(User.username == username).first()
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme),
+                           db=Depends(get_session)) -> AuthenticatedUser:
     """
     Get the current authenticated user from JWT token.
 
+    Tokens seen before are answered from ``token_user_cache`` without decoding
+    the JWT or querying the database.
+
     Args:
         token: The JWT token from the request
         db: Database session
 
     Returns:
-        User: The authenticated user
+        AuthenticatedUser: Snapshot of the authenticated user
 
     Raises:
         HTTPException: If authentication fails
     """
+    cached_user = token_user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -116,14 +253,19 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     )
 
     token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = await run_in_session(db, _get_user_by_username, token_data.username)
 
     if user is None:
         raise credentials_exception
-    return user
+
+    current_user = AuthenticatedUser(id=user.id, username=user.username, is_active=user.is_active)
+    token_user_cache.set(token, current_user, token_data.exp)
+    return current_user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
     """
     Get the current active user.
 
@@ -131,7 +273,7 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         current_user: The current authenticated user
 
     Returns:
-        User: The active user
+        AuthenticatedUser: The active user
 
     Raises:
         HTTPException: If user is inactive
@@ -0,0 +1,134 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When a burst of identical requests arrives (the same catalog page, the same
+book), only the first one runs the database call. The others, arriving while
+it is in flight, wait for it and share its result (or a copy of its
+exception: each request raises its own object, with its own traceback). Nothing
+is kept once the call returns, so this complements the response cache rather
+than replacing it: it also covers cache misses, reads that bypass the cache
+and endpoints that are not cached at all.
+
+Shared results are handed to several requests and must be treated as
+read-only. Coalesced calls should return plain data (Pydantic models, dicts,
+scalars) rather than ORM instances, which belong to the leader's session.
+Writes call ``forget`` once committed, so reads that start after a write
+never join a call that may have read the data before it.
+
+Groups live in the event loop of one worker process and need no locking.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .metrics import registry
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "single_flight_calls_total", "Reads executed by a single-flight group", ["group", "operation"]
+)
+SINGLE_FLIGHT_COALESCED = registry.counter(
+    "single_flight_coalesced_total", "Reads that shared the result of an identical in-flight read",
+    ["group", "operation"]
+)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Mark the exception as retrieved when no request joined the call
+    if not future.cancelled():
+        future.exception()
+
+
+def _copy_exception(exc: Exception) -> Exception:
+    """Copy of ``exc`` for one waiting request, so requests never share a traceback."""
+    try:
+        return copy.copy(exc)
+    except Exception:
+        # Exceptions whose constructor cannot be replayed from their args
+        return exc
+
+
+class SingleFlight:
+    """
+    Group of calls deduplicated while in flight.
+
+    Args:
+        name: Group name used in metrics
+        enabled: When False, every call runs on its own
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, operation: str, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call``, or wait for the identical call already in flight.
+
+        Args:
+            operation: Name of the operation, part of the key and of the metric labels
+            key: Hashable arguments identifying the call
+            call: Coroutine function running the read
+
+        Returns:
+            The result of the call, possibly shared with concurrent callers
+
+        Raises:
+            Exception: The exception of the call; requests that joined it get a copy
+        """
+        if not self.enabled:
+            return await call()
+
+        flight_key = (operation, key)
+        future = self._in_flight.get(flight_key)
+        if future is not None:
+            self.coalesced += 1
+            SINGLE_FLIGHT_COALESCED.inc(labels=(self.name, operation))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # This request was cancelled: propagate. The leader was cancelled
+                # (its client went away): run the call again for this request.
+                if not future.cancelled():
+                    raise
+                return await self.do(operation, key, call)
+            except Exception as e:
+                raise _copy_exception(e) from e
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._in_flight[flight_key] = future
+        self.calls += 1
+        SINGLE_FLIGHT_CALLS.inc(labels=(self.name, operation))
+        try:
+            result = await call()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._in_flight.get(flight_key) is future:
+                del self._in_flight[flight_key]
+
+    def forget(self) -> None:
+        """Let later calls start afresh instead of joining the calls now in flight."""
+        self._in_flight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return in-flight and coalescing counters."""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
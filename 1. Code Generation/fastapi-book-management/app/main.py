@@ -8,14 +8,22 @@ CRUD operations for books, and reading status tracking.
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import time
 import uvicorn
 
 from .core.config import get_settings
-from .core.database import create_tables
-from .core.logging import get_logger, log_api_request, log_api_response
+from .core.database import async_engine, create_tables
+from .core.admission import AdmissionControlMiddleware, admission_stats
+from .core.auth_cache import token_user_cache
+from .core.cache import book_response_cache
+from .core.responses import FastJSONResponse, JSON_ENCODER
+from .core.read_replicas import ReadYourWritesMiddleware, replica_set
+from .core.security import password_hash_pool
+from .core.metrics import PROMETHEUS_CONTENT_TYPE, registry as metrics_registry
+from .core.request_metrics import MetricsMiddleware
+from .core.logging import get_logger, log_api_request, log_api_response, sample_request_log
 from .core.exceptions import (
     BookManagementException,
     ValidationError,
@@ -26,6 +34,7 @@ from .core.exceptions import (
     DatabaseError
 )
 from .routers import auth_router, books_router, users_router
+from .services.book_service import book_single_flight
 
 # Get settings and logger
 settings = get_settings()
@@ -49,6 +58,12 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Book Management System...")
+    password_hash_pool.shutdown()
+    await book_response_cache.close()
+    if replica_set is not None:
+        await replica_set.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 # Create FastAPI application
@@ -59,6 +74,7 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
 )
 
 # Add CORS middleware
@@ -82,32 +98,36 @@ if not settings.DEBUG:
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
     """Log requests and responses with timing information."""
-    start_time = time.time()
+    start_time = time.perf_counter()
+    # Successful requests are logged for a sample only; failures always are
+    sampled = sample_request_log()
 
     # Log request
-    log_api_request(
-        method=request.method,
-        path=str(request.url.path),
-        client_ip=request.client.host if request.client else None
-    )
+    if sampled:
+        log_api_request(
+            method=request.method,
+            path=str(request.url.path),
+            client_ip=request.client.host if request.client else None
+        )
 
     # Process request
     try:
         response = await call_next(request)
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         # Log response
-        log_api_response(
-            method=request.method,
-            path=str(request.url.path),
-            status_code=response.status_code,
-            processing_time=processing_time
-        )
+        if sampled or response.status_code >= 400:
+            log_api_response(
+                method=request.method,
+                path=str(request.url.path),
+                status_code=response.status_code,
+                processing_time=processing_time
+            )
 
         return response
 
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         logger.error(f"Request failed: {str(e)}", exc_info=True)
 
         # Log failed response
@@ -122,6 +142,20 @@ async def logging_middleware(request: Request, call_next):
         raise
 
 
+# Route the next reads of a client that just wrote to the primary
+if replica_set is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+
+# Shed load before it queues behind the database pool; inside the metrics so rejections are counted
+if settings.ADMISSION_CONTROL:
+    app.add_middleware(AdmissionControlMiddleware)
+
+
+# Request metrics, added last so they wrap every other middleware
+app.add_middleware(MetricsMiddleware)
+
+
 # Exception handlers
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request: Request, exc: ValidationError):
@@ -223,10 +257,24 @@ async def health_check():
         "status": "healthy",
         "app_name": settings.APP_NAME,
         "version": settings.APP_VERSION,
-        "debug": settings.DEBUG
+        "debug": settings.DEBUG,
+        "password_hash_pool": password_hash_pool.stats(),
+        "auth_cache": token_user_cache.stats(),
+        "response_cache": book_response_cache.stats(),
+        "read_coalescing": book_single_flight.stats(),
+        "admission": admission_stats(),
+        "read_replicas": replica_set.stats() if replica_set is not None else None,
+        "json_encoder": JSON_ENCODER if settings.FAST_JSON_RESPONSES else "standard"
     }
 
 
+# Metrics endpoint
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Expose application metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Include routers
 app.include_router(auth_router, prefix=settings.API_V1_STR)
 app.include_router(books_router, prefix=settings.API_V1_STR)
@@ -2,5 +2,6 @@ from .base import Base
 from .user import User
 from .book import Book
 from .user_book_status import UserBookStatus
+from .user_reading_stats import UserReadingStats
 
-__all__ = ["Base", "User", "Book", "UserBookStatus"]
\ No newline at end of file
+__all__ = ["Base", "User", "Book", "UserBookStatus", "UserReadingStats"]
\ No newline at end of file
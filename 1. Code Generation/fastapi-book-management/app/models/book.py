@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -10,8 +10,8 @@ class Book(Base):
     __tablename__ = "books"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(200), nullable=False, index=True)
-    author = Column(String(100), nullable=False, index=True)
+    title = Column(String(200), nullable=False)
+    author = Column(String(100), nullable=False)
     published_year = Column(Integer, nullable=False)
     genre = Column(String(50), nullable=False, index=True)
     description = Column(String(1000))
@@ -19,5 +19,15 @@ class Book(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Keyset pagination orders and seeks on (sort column, id)
+    __table_args__ = (
+        Index("ix_books_title_id", "title", "id"),
+        Index("ix_books_author_id", "author", "id"),
+        Index("ix_books_published_year_id", "published_year", "id"),
+    )
+
+    # Fetch server-generated columns (id, created_at, updated_at) with RETURNING on write
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationship to user book status
     user_statuses = relationship("UserBookStatus", back_populates="book", cascade="all, delete-orphan")
\ No newline at end of file
@@ -17,5 +17,8 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Fetch server-generated columns (id, created_at, updated_at) with RETURNING on write
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationship to user book status
     book_statuses = relationship("UserBookStatus", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
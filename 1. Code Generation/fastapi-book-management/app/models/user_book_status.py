@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -17,8 +17,14 @@ class UserBookStatus(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Ensure unique combination of user and book
-    __table_args__ = (UniqueConstraint('user_id', 'book_id', name='unique_user_book'),)
+    __table_args__ = (
+        # Ensure unique combination of user and book
+        UniqueConstraint('user_id', 'book_id', name='unique_user_book'),
+        # Covers the per-user listings filtered by read status and the stats aggregate
+        Index('ix_user_book_status_user_read_book', 'user_id', 'is_read', 'book_id'),
+        # Statuses of a book: delete cascade and reader lookups
+        Index('ix_user_book_status_book_id', 'book_id'),
+    )
 
     # Relationships
     user = relationship("User", back_populates="book_statuses")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class UserReadingStats(Base):
+    """Per-user reading counters maintained alongside user_book_status."""
+
+    __tablename__ = "user_reading_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_books = Column(Integer, default=0, nullable=False)
+    read_books = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,12 +1,11 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.auth_cache import AuthenticatedUser
 from ..core.security import create_access_token, get_current_user
 from ..core.config import get_settings
-from ..services.auth_service import AuthService
+from ..services.auth_service import AsyncAuthService, get_auth_service
 from ..schemas.user import UserCreate, UserResponse
 from ..schemas.token import Token
 
@@ -17,37 +16,36 @@ settings = get_settings()
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_create: UserCreate,
-    db: Session = Depends(get_db)
+    auth_service: AsyncAuthService = Depends(get_auth_service)
 ):
     """
     Register a new user.
 
     Args:
         user_create: User registration data
-        db: Database session
+        auth_service: Authentication service bound to the request's database session
 
     Returns:
         UserResponse: Created user information
 
     Raises:
-        HTTPException: If username or email already exists
+        ConflictError: If username or email already exists
     """
-    auth_service = AuthService(db)
-    user = auth_service.create_user(user_create)
+    user = await auth_service.create_user(user_create)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    auth_service: AsyncAuthService = Depends(get_auth_service)
 ):
     """
     Authenticate user and return access token.
 
     Args:
         form_data: Login form data (username and password)
-        db: Database session
+        auth_service: Authentication service bound to the request's database session
 
     Returns:
         Token: JWT access token
@@ -55,8 +53,7 @@ async def login_user(
     Raises:
         HTTPException: If authentication fails
     """
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    user = await auth_service.authenticate_user(form_data.username, form_data.password)
 
     if not user:
         raise HTTPException(
@@ -75,15 +72,28 @@ async def login_user(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user = Depends(get_current_user)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    auth_service: AsyncAuthService = Depends(get_auth_service)
 ):
     """
     Get current authenticated user information.
 
     Args:
         current_user: Current authenticated user
+        auth_service: Authentication service bound to the request's database session
 
     Returns:
         UserResponse: Current user information
+
+    Raises:
+        HTTPException: If the user no longer exists
     """
-    return current_user
\ No newline at end of file
+    user = await auth_service.get_user_by_id(current_user.id)
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    return user
\ No newline at end of file
@@ -1,86 +1,305 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-
-from ..core.database import get_db
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from ..core.auth_cache import AuthenticatedUser
+from ..core.cache import book_response_cache
+from ..core.config import get_settings
+from ..core.pagination import TOTAL_PATTERN
+from ..core.read_replicas import is_replica_session
+from ..core.responses import FastJSONResponse, dumps
 from ..core.security import get_current_active_user
-from ..services.book_service import BookService
-from ..schemas.book import BookCreate, BookUpdate, BookResponse
-from ..models.user import User
+from ..services.book_export import EXPORT_FORMATS, stream_book_export
+from ..services.book_import import import_book_stream, iter_csv_records, iter_ndjson_records
+from ..services.book_service import (
+    AsyncBookService, BOOK_SORT_PATTERN, get_book_service, get_read_book_service, parse_book_fields
+)
+from ..schemas.book import (
+    BookCreate, BookUpdate, BookResponse, BookPage, BookImportResult, BookWithReadStatus, book_fields_model
+)
 
 router = APIRouter(prefix="/books", tags=["books"])
+settings = get_settings()
+
+# Serializers for the cached read endpoints
+book_adapter = TypeAdapter(BookResponse)
+book_list_adapter = TypeAdapter(List[BookResponse])
+
+
+@lru_cache(maxsize=256)
+def book_fields_list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    """Serializer of a book list trimmed to a sparse fieldset."""
+    return TypeAdapter(List[book_fields_model(fields)])
 
 
 @router.post("/", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
 async def create_book(
     book_create: BookCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    book_service: AsyncBookService = Depends(get_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Create a new book.
 
     Args:
         book_create: Book creation data
-        db: Database session
+        book_service: Book service bound to the request's database session
         current_user: Current authenticated user
 
     Returns:
         BookResponse: Created book information
 
     Raises:
-        HTTPException: If ISBN already exists
+        ConflictError: If ISBN already exists
     """
-    book_service = BookService(db)
-    book = book_service.create_book(book_create)
+    book = await book_service.create_book(book_create)
     return book
 
 
+@router.post("/import", response_model=BookImportResult)
+async def import_books(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$",
+                                  description="Body format; defaults from the Content-Type header"),
+    batch_size: int = Query(settings.BOOK_IMPORT_BATCH_SIZE, ge=1, le=50000,
+                            description="Records validated and inserted per batch"),
+    book_service: AsyncBookService = Depends(get_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Bulk import books from a streamed NDJSON or CSV body.
+
+    The body is parsed as it arrives. Every record is validated with the
+    ``BookCreate`` schema and valid rows are inserted batch by batch. Rows
+    that fail validation or collide on ISBN are reported individually and do
+    not stop the import.
+
+    Args:
+        request: Incoming request whose body is streamed
+        format: "ndjson" (one JSON object per line) or "csv" (with a header row)
+        batch_size: Records per batch
+        book_service: Book service bound to the request's database session
+        current_user: Current authenticated user
+
+    Returns:
+        BookImportResult: Import totals and per-row errors
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    parse = iter_csv_records if format == "csv" else iter_ndjson_records
+    return await import_book_stream(
+        book_service,
+        parse(request.stream()),
+        batch_size=batch_size,
+        max_errors=settings.BOOK_IMPORT_MAX_ERRORS
+    )
+
+
 @router.get("/", response_model=List[BookResponse])
 async def get_books(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     genre: Optional[str] = Query(None, description="Filter by genre"),
     author: Optional[str] = Query(None, description="Filter by author"),
     title: Optional[str] = Query(None, description="Filter by title"),
-    db: Session = Depends(get_db)
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over title, author and genre"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,author"),
+    book_service: AsyncBookService = Depends(get_read_book_service)
 ):
     """
     Get books with optional filtering.
 
+    With ``q`` the results are ranked by full-text relevance. With ``fields``
+    only those columns are selected and each book carries only those fields.
+    Responses are served from the response cache when possible and carry an
+    ETag; a matching ``If-None-Match`` gets a 304.
+
     Args:
+        request: Incoming request
         skip: Number of records to skip
         limit: Maximum number of records to return
         genre: Filter by genre
         author: Filter by author
         title: Filter by title (partial match)
-        db: Database session
+        q: Full-text search terms
+        fields: Sparse fieldset (default: every field)
+        book_service: Book service bound to the request's read session
 
     Returns:
         List[BookResponse]: List of books
+
+    Raises:
+        ValidationError: If ``fields`` names an unknown field
+    """
+    selected = parse_book_fields(fields)
+    params = {"skip": skip, "limit": limit, "genre": genre, "author": author, "title": title, "q": q}
+
+    async def render() -> bytes:
+        if selected:
+            books = await book_service.get_books(**params, fields=selected)
+            if settings.FAST_JSON_RESPONSES:
+                return dumps(books)
+            adapter = book_fields_list_adapter(selected)
+            return adapter.dump_json(adapter.validate_python(books))
+        if settings.FAST_JSON_RESPONSES:
+            return dumps(await book_service.get_books(**params, as_rows=True))
+        books = await book_service.get_books(**params)
+        return book_list_adapter.dump_json(book_list_adapter.validate_python(books))
+
+    key_params = {**params, "fields": ",".join(selected) if selected else None}
+    return await book_response_cache.respond(request, "list", key_params, render,
+                                             replica=is_replica_session(book_service.db))
+
+
+@router.get("/page", response_model=BookPage)
+async def get_books_page(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    sort: str = Query("id", pattern=BOOK_SORT_PATTERN,
+                      description="Sort key (id, title, author, published_year); prefix with - for descending"),
+    genre: Optional[str] = Query(None, description="Filter by genre"),
+    author: Optional[str] = Query(None, description="Filter by author"),
+    title: Optional[str] = Query(None, description="Filter by title"),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over title, author and genre"),
+    total: str = Query("exact", pattern=TOTAL_PATTERN,
+                       description="Total count on the first page: exact, estimated (planner estimate) "
+                                   "or none to skip it"),
+    book_service: AsyncBookService = Depends(get_read_book_service)
+):
     """
-    book_service = BookService(db)
-    books = book_service.get_books(
+    Get books with keyset (cursor) pagination and optional filtering.
+
+    Unlike skip/limit, the cost of a page does not depend on how deep it is.
+    The total is computed in the same query as the first page, so a separate
+    call to ``/books/stats/count`` is not needed; pages fetched with a cursor
+    carry no total.
+
+    Args:
+        cursor: Cursor of the previous page (omit for the first page)
+        limit: Maximum number of records to return
+        sort: Sort key, prefixed with "-" for descending order
+        genre: Filter by genre
+        author: Filter by author
+        title: Filter by title (partial match)
+        q: Full-text search terms
+        total: How to compute the first page's total count (exact, estimated or none)
+        book_service: Book service bound to the request's read session
+
+    Returns:
+        BookPage: Books, the total count and the cursor of the next page
+    """
+    page = await book_service.get_books_page(
+        cursor=cursor,
+        limit=limit,
+        sort=sort,
+        genre=genre,
+        author=author,
+        title=title,
+        q=q,
+        total=total
+    )
+    return page._asdict()
+
+
+@router.get("/with-status", response_model=List[BookWithReadStatus])
+async def get_books_with_read_status(
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    genre: Optional[str] = Query(None, description="Filter by genre"),
+    author: Optional[str] = Query(None, description="Filter by author"),
+    title: Optional[str] = Query(None, description="Filter by title"),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over title, author and genre"),
+    book_service: AsyncBookService = Depends(get_read_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Get books with the current user's reading status, with optional filtering.
+
+    Each book carries ``is_read`` and ``read_at`` (null for books the user
+    does not track), fetched in the same query as the books, so no
+    per-book status call is needed.
+
+    Args:
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        genre: Filter by genre
+        author: Filter by author
+        title: Filter by title (partial match)
+        q: Full-text search terms
+        book_service: Book service bound to the request's read session
+        current_user: Current authenticated user
+
+    Returns:
+        List[BookWithReadStatus]: Books with reading status
+    """
+    books = await book_service.get_books_with_read_status(
+        current_user.id,
         skip=skip,
         limit=limit,
         genre=genre,
         author=author,
-        title=title
+        title=title,
+        q=q,
+        as_rows=settings.FAST_JSON_RESPONSES
+    )
+    return FastJSONResponse(books) if settings.FAST_JSON_RESPONSES else books
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_books(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Output format"),
+    genre: Optional[str] = Query(None, description="Filter by genre"),
+    author: Optional[str] = Query(None, description="Filter by author"),
+    title: Optional[str] = Query(None, description="Filter by title"),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over title, author and genre"),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Export the book catalog as NDJSON or CSV, ordered by ID.
+
+    Rows are read from a server-side cursor and written to the response as
+    they arrive, so the export runs in constant memory whatever the size of
+    the catalog.
+
+    Args:
+        format: "ndjson" (one JSON object per line) or "csv" (with a header row)
+        genre: Filter by genre
+        author: Filter by author
+        title: Filter by title (partial match)
+        q: Full-text search terms
+        current_user: Current authenticated user
+
+    Returns:
+        StreamingResponse: The exported books
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    filters = {"genre": genre, "author": author, "title": title, "q": q}
+    return StreamingResponse(
+        stream_book_export(format, settings.BOOK_EXPORT_BATCH_SIZE, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="books.{extension}"'}
     )
-    return books
 
 
 @router.get("/{book_id}", response_model=BookResponse)
 async def get_book(
+    request: Request,
     book_id: int,
-    db: Session = Depends(get_db)
+    book_service: AsyncBookService = Depends(get_read_book_service)
 ):
     """
     Get a specific book by ID.
 
+    Served from the response cache when possible, with ETag support.
+
     Args:
+        request: Incoming request
         book_id: Book ID
-        db: Database session
+        book_service: Book service bound to the request's read session
 
     Returns:
         BookResponse: Book information
@@ -88,24 +307,28 @@ async def get_book(
     Raises:
         HTTPException: If book not found
     """
-    book_service = BookService(db)
-    book = book_service.get_book(book_id)
+    async def render() -> Optional[bytes]:
+        book = await book_service.get_book(book_id)
+        return book_adapter.dump_json(book_adapter.validate_python(book)) if book else None
 
-    if not book:
+    response = await book_response_cache.respond(request, "item", {"id": book_id}, render,
+                                                 replica=is_replica_session(book_service.db))
+
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Book not found"
         )
 
-    return book
+    return response
 
 
 @router.put("/{book_id}", response_model=BookResponse)
 async def update_book(
     book_id: int,
     book_update: BookUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    book_service: AsyncBookService = Depends(get_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Update a book.
@@ -113,17 +336,17 @@ async def update_book(
     Args:
         book_id: Book ID to update
         book_update: Book update data
-        db: Database session
+        book_service: Book service bound to the request's database session
         current_user: Current authenticated user
 
     Returns:
         BookResponse: Updated book information
 
     Raises:
-        HTTPException: If book not found or ISBN already exists
+        HTTPException: If book not found
+        ConflictError: If ISBN already exists
     """
-    book_service = BookService(db)
-    book = book_service.update_book(book_id, book_update)
+    book = await book_service.update_book(book_id, book_update)
 
     if not book:
         raise HTTPException(
@@ -137,22 +360,21 @@ async def update_book(
 @router.delete("/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_book(
     book_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    book_service: AsyncBookService = Depends(get_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Delete a book.
 
     Args:
         book_id: Book ID to delete
-        db: Database session
+        book_service: Book service bound to the request's database session
         current_user: Current authenticated user
 
     Raises:
         HTTPException: If book not found
     """
-    book_service = BookService(db)
-    deleted = book_service.delete_book(book_id)
+    deleted = await book_service.delete_book(book_id)
 
     if not deleted:
         raise HTTPException(
@@ -166,7 +388,8 @@ async def get_books_count(
     genre: Optional[str] = Query(None, description="Filter by genre"),
     author: Optional[str] = Query(None, description="Filter by author"),
     title: Optional[str] = Query(None, description="Filter by title"),
-    db: Session = Depends(get_db)
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over title, author and genre"),
+    book_service: AsyncBookService = Depends(get_read_book_service)
 ):
     """
     Get total count of books with optional filtering.
@@ -175,11 +398,11 @@ async def get_books_count(
         genre: Filter by genre
         author: Filter by author
         title: Filter by title (partial match)
-        db: Database session
+        q: Full-text search terms
+        book_service: Book service bound to the request's read session
 
     Returns:
         dict: Total count of books
     """
-    book_service = BookService(db)
-    count = book_service.get_books_count(genre=genre, author=author, title=title)
+    count = await book_service.get_books_count(genre=genre, author=author, title=title, q=q)
     return {"count": count}
\ No newline at end of file
@@ -1,29 +1,32 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.auth_cache import AuthenticatedUser
+from ..core.config import get_settings
+from ..core.pagination import TOTAL_PATTERN
+from ..core.responses import FastJSONResponse
 from ..core.security import get_current_active_user
-from ..services.user_book_service import UserBookService
-from ..schemas.book import BookResponse
-from ..schemas.user_book_status import UserBookStatusResponse
-from ..models.user import User
+from ..services.book_service import BOOK_SORT_PATTERN
+from ..services.user_book_service import AsyncUserBookService, get_read_user_book_service, get_user_book_service
+from ..schemas.book import BookResponse, BookPage
+from ..schemas.user_book_status import UserBookStatusResponse, UserBookStatusBatch, UserBookStatusBatchResult
 
 router = APIRouter(prefix="/users", tags=["users"])
+settings = get_settings()
 
 
 @router.post("/books/{book_id}/read", response_model=UserBookStatusResponse)
 async def mark_book_as_read(
     book_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Mark a book as read for the current user.
 
     Args:
         book_id: Book ID to mark as read
-        db: Database session
+        user_book_service: Reading status service bound to the request's database session
         current_user: Current authenticated user
 
     Returns:
@@ -32,23 +35,22 @@ async def mark_book_as_read(
     Raises:
         HTTPException: If book not found
     """
-    user_book_service = UserBookService(db)
-    status = user_book_service.mark_book_as_read(current_user.id, book_id)
+    status = await user_book_service.mark_book_as_read(current_user.id, book_id)
     return status
 
 
 @router.post("/books/{book_id}/unread", response_model=UserBookStatusResponse)
 async def mark_book_as_unread(
     book_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Mark a book as unread for the current user.
 
     Args:
         book_id: Book ID to mark as unread
-        db: Database session
+        user_book_service: Reading status service bound to the request's database session
         current_user: Current authenticated user
 
     Returns:
@@ -57,17 +59,39 @@ async def mark_book_as_unread(
     Raises:
         HTTPException: If book not found
     """
-    user_book_service = UserBookService(db)
-    status = user_book_service.mark_book_as_unread(current_user.id, book_id)
+    status = await user_book_service.mark_book_as_unread(current_user.id, book_id)
     return status
 
 
+@router.post("/me/books/status", response_model=UserBookStatusBatchResult)
+async def set_reading_statuses(
+    batch: UserBookStatusBatch,
+    user_book_service: AsyncUserBookService = Depends(get_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Mark several books as read or unread for the current user in one request.
+
+    Unknown book IDs are skipped and reported in ``missing_book_ids``; the
+    other statuses are written in a single upsert.
+
+    Args:
+        batch: Book IDs and their new read state
+        user_book_service: Reading status service bound to the request's database session
+        current_user: Current authenticated user
+
+    Returns:
+        UserBookStatusBatchResult: Updated statuses and unknown book IDs
+    """
+    return await user_book_service.set_reading_statuses(current_user.id, batch.items)
+
+
 @router.get("/me/books/read", response_model=List[BookResponse])
 async def get_user_read_books(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_read_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Get books marked as read by the current user.
@@ -75,28 +99,28 @@ async def get_user_read_books(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        db: Database session
+        user_book_service: Reading status service bound to the request's read session
         current_user: Current authenticated user
 
     Returns:
         List[BookResponse]: List of read books
     """
-    user_book_service = UserBookService(db)
-    books = user_book_service.get_user_books_with_status(
+    books = await user_book_service.get_user_books_with_status(
         current_user.id,
         is_read=True,
         skip=skip,
-        limit=limit
+        limit=limit,
+        as_rows=settings.FAST_JSON_RESPONSES
     )
-    return books
+    return FastJSONResponse(books) if settings.FAST_JSON_RESPONSES else books
 
 
 @router.get("/me/books/unread", response_model=List[BookResponse])
 async def get_user_unread_books(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_read_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Get books marked as unread by the current user.
@@ -104,28 +128,28 @@ async def get_user_unread_books(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        db: Database session
+        user_book_service: Reading status service bound to the request's read session
         current_user: Current authenticated user
 
     Returns:
         List[BookResponse]: List of unread books
     """
-    user_book_service = UserBookService(db)
-    books = user_book_service.get_user_books_with_status(
+    books = await user_book_service.get_user_books_with_status(
         current_user.id,
         is_read=False,
         skip=skip,
-        limit=limit
+        limit=limit,
+        as_rows=settings.FAST_JSON_RESPONSES
     )
-    return books
+    return FastJSONResponse(books) if settings.FAST_JSON_RESPONSES else books
 
 
 @router.get("/me/books", response_model=List[BookResponse])
 async def get_user_all_books(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_read_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Get all books tracked by the current user (both read and unread).
@@ -133,33 +157,72 @@ async def get_user_all_books(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
-        db: Database session
+        user_book_service: Reading status service bound to the request's read session
         current_user: Current authenticated user
 
     Returns:
         List[BookResponse]: List of all user's books
     """
-    user_book_service = UserBookService(db)
-    books = user_book_service.get_user_books_with_status(
+    books = await user_book_service.get_user_books_with_status(
         current_user.id,
         skip=skip,
-        limit=limit
+        limit=limit,
+        as_rows=settings.FAST_JSON_RESPONSES
+    )
+    return FastJSONResponse(books) if settings.FAST_JSON_RESPONSES else books
+
+
+@router.get("/me/books/page", response_model=BookPage)
+async def get_user_books_page(
+    is_read: Optional[bool] = Query(None, description="Filter by read status (omit for all books)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    sort: str = Query("id", pattern=BOOK_SORT_PATTERN,
+                      description="Sort key (id, title, author, published_year); prefix with - for descending"),
+    total: str = Query("exact", pattern=TOTAL_PATTERN,
+                       description="Total count on the first page: exact, estimated (planner estimate) "
+                                   "or none to skip it"),
+    user_book_service: AsyncUserBookService = Depends(get_read_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Get books tracked by the current user with keyset (cursor) pagination.
+
+    Args:
+        is_read: Filter by read status (None for all books)
+        cursor: Cursor of the previous page (omit for the first page)
+        limit: Maximum number of records to return
+        sort: Sort key, prefixed with "-" for descending order
+        total: How to compute the first page's total count (exact, estimated or none)
+        user_book_service: Reading status service bound to the request's read session
+        current_user: Current authenticated user
+
+    Returns:
+        BookPage: Books, the total count and the cursor of the next page
+    """
+    page = await user_book_service.get_user_books_page(
+        current_user.id,
+        is_read=is_read,
+        cursor=cursor,
+        limit=limit,
+        sort=sort,
+        total=total
     )
-    return books
+    return page._asdict()
 
 
 @router.get("/me/books/{book_id}/status", response_model=UserBookStatusResponse)
 async def get_book_reading_status(
     book_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_read_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Get reading status for a specific book.
 
     Args:
         book_id: Book ID
-        db: Database session
+        user_book_service: Reading status service bound to the request's read session
         current_user: Current authenticated user
 
     Returns:
@@ -168,33 +231,31 @@ async def get_book_reading_status(
     Raises:
         HTTPException: If status not found
     """
-    user_book_service = UserBookService(db)
-    status = user_book_service.get_book_reading_status(current_user.id, book_id)
+    reading_status = await user_book_service.get_book_reading_status(current_user.id, book_id)
 
-    if not status:
+    if not reading_status:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reading status not found"
         )
 
-    return status
+    return reading_status
 
 
 @router.get("/me/stats")
 async def get_user_reading_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    user_book_service: AsyncUserBookService = Depends(get_user_book_service),
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
 ):
     """
     Get reading statistics for the current user.
 
     Args:
-        db: Database session
+        user_book_service: Reading status service bound to the request's database session
         current_user: Current authenticated user
 
     Returns:
         dict: Reading statistics
     """
-    user_book_service = UserBookService(db)
-    stats = user_book_service.get_user_reading_stats(current_user.id)
+    stats = await user_book_service.get_user_reading_stats(current_user.id)
     return stats
\ No newline at end of file
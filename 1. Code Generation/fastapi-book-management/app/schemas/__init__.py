@@ -1,11 +1,13 @@
 from .user import UserCreate, UserResponse, UserLogin, UserUpdate
-from .book import BookCreate, BookUpdate, BookResponse
-from .user_book_status import UserBookStatusResponse, UserBookStatusCreate
+from .book import BookCreate, BookUpdate, BookResponse, BookPage, BookImportError, BookImportResult
+from .user_book_status import (
+    UserBookStatusResponse, UserBookStatusCreate, UserBookStatusBatch, UserBookStatusBatchResult
+)
 from .token import Token, TokenData
 
 __all__ = [
     "UserCreate", "UserResponse", "UserLogin", "UserUpdate",
-    "BookCreate", "BookUpdate", "BookResponse",
-    "UserBookStatusResponse", "UserBookStatusCreate",
+    "BookCreate", "BookUpdate", "BookResponse", "BookPage", "BookImportError", "BookImportResult",
+    "UserBookStatusResponse", "UserBookStatusCreate", "UserBookStatusBatch", "UserBookStatusBatchResult",
     "Token", "TokenData"
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+from pydantic import BaseModel, ConfigDict, Field, create_model
 from datetime import datetime
 
 
@@ -38,7 +39,49 @@ class BookResponse(BookBase):
         from_attributes = True
 
 
+@lru_cache(maxsize=256)
+def book_fields_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Build BookResponse trimmed to a sparse fieldset.
+
+    Args:
+        fields: BookResponse field names to keep, in output order
+
+    Returns:
+        Type[BaseModel]: Model with only those fields, validated like BookResponse
+    """
+    return create_model(
+        "BookFields_" + "_".join(fields),
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (BookResponse.model_fields[name].annotation, BookResponse.model_fields[name]) for name in fields},
+    )
+
+
 class BookWithReadStatus(BookResponse):
     """Schema for book response with user reading status."""
     is_read: Optional[bool] = None
-    read_at: Optional[datetime] = None
\ No newline at end of file
+    read_at: Optional[datetime] = None
+
+
+class BookPage(BaseModel):
+    """Schema for a cursor-paginated page of books."""
+    items: List[BookResponse]
+    total: Optional[int] = Field(None, description="Total matching books (null when not requested)")
+    total_estimated: bool = Field(False, description="Whether total is a planner estimate")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page (null on the last page)")
+
+
+class BookImportError(BaseModel):
+    """Schema for a row rejected by a bulk import."""
+    line: int = Field(..., description="Line number of the record in the uploaded file")
+    error: str
+    isbn: Optional[str] = None
+
+
+class BookImportResult(BaseModel):
+    """Schema for the outcome of a bulk import."""
+    received: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[BookImportError] = Field(default_factory=list)
+    errors_truncated: bool = Field(False, description="Whether more rows failed than are listed in errors")
@@ -10,4 +10,5 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     """Schema for token data."""
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+    exp: Optional[int] = None
\ No newline at end of file
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 
@@ -28,4 +28,16 @@ class UserBookStatusResponse(UserBookStatusBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class UserBookStatusBatch(BaseModel):
+    """Schema for setting the reading status of several books at once."""
+    items: List[UserBookStatusCreate] = Field(..., min_length=1, max_length=1000,
+                                              description="Books and their new read state")
+
+
+class UserBookStatusBatchResult(BaseModel):
+    """Schema for the result of a batch reading status update."""
+    statuses: List[UserBookStatusResponse]
+    missing_book_ids: List[int] = Field(default_factory=list, description="Book IDs that do not exist")
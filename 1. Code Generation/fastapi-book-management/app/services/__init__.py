@@ -1,5 +1,9 @@
-from .auth_service import AuthService
-from .book_service import BookService
-from .user_book_service import UserBookService
+from .auth_service import AuthService, AsyncAuthService, get_auth_service
+from .book_service import BookService, AsyncBookService, get_book_service, get_read_book_service
+from .user_book_service import UserBookService, AsyncUserBookService, get_user_book_service, get_read_user_book_service
 
-__all__ = ["AuthService", "BookService", "UserBookService"]
\ No newline at end of file
+__all__ = [
+    "AuthService", "AsyncAuthService", "get_auth_service",
+    "BookService", "AsyncBookService", "get_book_service", "get_read_book_service",
+    "UserBookService", "AsyncUserBookService", "get_user_book_service", "get_read_user_book_service"
+]
\ No newline at end of file
@@ -1,10 +1,23 @@
 from typing import Optional
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
+from fastapi import Depends
 
+from ..core.database import get_session
 from ..models.user import User
 from ..schemas.user import UserCreate
-from ..core.security import get_password_hash, verify_password
+from ..core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+from .base import AsyncService, commit_or_conflict
+
+# Conflict message per unique column of users
+USER_CONFLICTS = {
+    "username": "Username already registered",
+    "email": "Email already registered",
+}
 
 
 class AuthService:
@@ -24,10 +37,7 @@ class AuthService:
         Returns:
             User: Authenticated user or None if authentication fails
         """
-        # Try to find user by username or email
-        user = self.db.query(User).filter(
-            (User.username == username) | (User.email == username)
-        ).first()
+        user = self.get_user_by_login(username)
 
         if not user:
             return None
@@ -48,36 +58,64 @@ class AuthService:
             User: The created user
 
         Raises:
-            HTTPException: If username or email already exists
-        """
-        # Check if username already exists
-        if self.db.query(User).filter(User.username == user_create.username).first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
-            )
-
-        # Check if email already exists
-        if self.db.query(User).filter(User.email == user_create.email).first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-
-        # Create new user
-        hashed_password = get_password_hash(user_create.password)
+            ConflictError: If username or email already exists
+        """
+        return self.add_user(user_create, get_password_hash(user_create.password))
+
+    def add_user(self, user_create: UserCreate, hashed_password: str) -> User:
+        """
+        Insert a new user with an already hashed password.
+
+        Args:
+            user_create: User creation data
+            hashed_password: bcrypt hash of the user's password
+
+        Returns:
+            User: The created user
+
+        Raises:
+            ConflictError: If username or email already exists
+        """
         db_user = User(
             username=user_create.username,
             email=user_create.email,
-            hashed_password=hashed_password
+            hashed_password=hashed_password,
+            # Set explicitly so the write does not need a follow-up SELECT for it
+            updated_at=None
         )
 
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        # The unique indexes reject duplicates; id and created_at come back via RETURNING
+        commit_or_conflict(self.db, "users", USER_CONFLICTS)
 
         return db_user
 
+    def get_user_by_login(self, login: str) -> Optional[User]:
+        """
+        Get user by username or email.
+
+        Args:
+            login: Username or email to search for
+
+        Returns:
+            User: Found user or None
+        """
+        return self.db.query(User).filter(
+            (User.username == login) | (User.email == login)
+        ).first()
+
+    def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """
+        Get user by ID.
+
+        Args:
+            user_id: User ID to search for
+
+        Returns:
+            User: Found user or None
+        """
+        return self.db.query(User).filter(User.id == user_id).first()
+
     def get_user_by_username(self, username: str) -> Optional[User]:
         """
         Get user by username.
@@ -100,4 +138,60 @@ class AuthService:
         Returns:
             User: Found user or None
         """
-        return self.db.query(User).filter(User.email == email).first()
\ No newline at end of file
+        return self.db.query(User).filter(User.email == email).first()
+
+
+class AsyncAuthService(AsyncService):
+    """Asyncio variant of AuthService for use from request handlers."""
+
+    sync_service = AuthService
+
+    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+        """
+        Authenticate a user, verifying the password on the hashing pool.
+
+        Args:
+            username: Username or email
+            password: Plain text password
+
+        Returns:
+            User: Authenticated user or None if authentication fails
+        """
+        user = await self.get_user_by_login(username)
+
+        if not user:
+            return None
+
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+
+        return user
+
+    async def create_user(self, user_create: UserCreate) -> User:
+        """
+        Create a new user, hashing the password on the hashing pool.
+
+        Args:
+            user_create: User creation data
+
+        Returns:
+            User: The created user
+
+        Raises:
+            ConflictError: If username or email already exists
+        """
+        hashed_password = await get_password_hash_async(user_create.password)
+        return await self.add_user(user_create, hashed_password)
+
+
+def get_auth_service(db=Depends(get_session)) -> AsyncAuthService:
+    """
+    AuthService dependency for FastAPI.
+
+    Args:
+        db: Database session selected by the ASYNC_DATABASE setting
+
+    Returns:
+        AsyncAuthService: Service bound to the request's database session
+    """
+    return AsyncAuthService(db)
@@ -0,0 +1,157 @@
+import functools
+import inspect
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.database import run_in_session
+from ..core.exceptions import ConflictError
+from ..core.single_flight import SingleFlight
+
+
+def unique_violation(error: IntegrityError, table: str, messages: Dict[str, str]) -> Optional[ConflictError]:
+    """
+    Translate a unique-constraint violation into a ConflictError.
+
+    Args:
+        error: IntegrityError raised by a flush or commit
+        table: Table the failed statement wrote
+        messages: Conflict message per unique column of ``table``
+
+    Returns:
+        ConflictError: For a violation on one of the columns, None for any other integrity error
+    """
+    text = str(error.orig)
+    for column, message in messages.items():
+        # SQLite: "UNIQUE constraint failed: users.email"; PostgreSQL names the
+        # index ("ix_users_email") and the key ("Key (email)=(...) already exists")
+        if f"{table}.{column}" in text or f"{table}_{column}" in text or f"({column})=" in text:
+            return ConflictError(message)
+    return None
+
+
+def commit_or_conflict(db: Session, table: str, messages: Dict[str, str]) -> None:
+    """
+    Commit, turning a unique-constraint violation into a ConflictError.
+
+    Writes rely on the unique constraints instead of checking for duplicates
+    first, which saves a query per unique column and cannot race with a
+    concurrent writer.
+
+    Args:
+        db: Session to commit
+        table: Table the pending writes target
+        messages: Conflict message per unique column of ``table``
+
+    Raises:
+        ConflictError: If the commit violated one of those unique constraints
+    """
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        conflict = unique_violation(e, table, messages)
+        if conflict is None:
+            raise
+        raise conflict from e
+
+
+def _async_method(name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Build a coroutine method delegating to the synchronous service method ``name``."""
+
+    @functools.wraps(func)
+    async def method(self, *args, **kwargs):
+        if self.single_flight is not None and name in self.coalesced_methods:
+            return await self.run_coalesced(name, *args, **kwargs)
+        return await self.run_sync_method(name, *args, **kwargs)
+
+    return method
+
+
+class AsyncService:
+    """
+    Base class for the asyncio variants of the services.
+
+    Subclasses set ``sync_service`` to the synchronous service they mirror.
+    Every public method of that service is exposed as a coroutine running the
+    synchronous implementation through ``run_in_session``, so the business
+    logic lives in one place while request handlers never block the event
+    loop. Methods that need a native async implementation can be overridden.
+
+    Read methods listed in ``coalesced_methods`` go through ``single_flight``:
+    identical concurrent calls share one execution and its result. The result
+    passes through ``detach_result`` first, so requests share plain data
+    instead of ORM instances bound to one request's session.
+    """
+
+    sync_service: Type = None
+    coalesced_methods: Tuple[str, ...] = ()
+    single_flight: Optional[SingleFlight] = None
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+
+    async def run_sync_method(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a method of ``sync_service`` through ``run_in_session``.
+
+        Overrides use this to wrap the synchronous implementation with async
+        work of their own.
+
+        Args:
+            name: Name of the synchronous service method
+            *args: Positional arguments of the method
+            **kwargs: Keyword arguments of the method
+
+        Returns:
+            The return value of the method
+        """
+        def call(session: Session):
+            return getattr(self.sync_service(session), name)(*args, **kwargs)
+
+        return await run_in_session(self.db, call)
+
+    async def run_coalesced(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a read method of ``sync_service``, sharing identical in-flight calls.
+
+        Args:
+            name: Name of the synchronous service method
+            *args: Positional arguments of the method
+            **kwargs: Keyword arguments of the method
+
+        Returns:
+            The return value of the method, possibly shared with concurrent callers
+        """
+        async def call():
+            return self.detach_result(name, await self.run_sync_method(name, *args, **kwargs))
+
+        # Calls on different databases (the primary, each replica) never share a result
+        key = (self.db.info.get("replica"), args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return await call()
+        return await self.single_flight.do(name, key, call)
+
+    def detach_result(self, name: str, result: Any) -> Any:
+        """
+        Convert the result of a coalesced read into plain data safe to share.
+
+        Args:
+            name: Name of the synchronous service method
+            result: Its return value
+
+        Returns:
+            The result without ORM instances; the default returns it unchanged
+        """
+        return result
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, member in vars(cls.sync_service).items():
+            if name.startswith("_") or not inspect.isfunction(member) or name in cls.__dict__:
+                continue
+            setattr(cls, name, _async_method(name, member))
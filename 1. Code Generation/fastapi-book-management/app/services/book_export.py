@@ -0,0 +1,93 @@
+"""
+Streaming serializers for the book catalog export.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from sqlalchemy import Row
+
+from ..core.database import open_session
+from .book_service import AsyncBookService, BOOK_EXPORT_FIELDS
+
+# Media type and file extension of each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_ndjson_batch(rows: Sequence[Row]) -> bytes:
+    """
+    Serialize rows as newline-delimited JSON objects.
+
+    Args:
+        rows: Rows of BOOK_EXPORT_FIELDS
+
+    Returns:
+        bytes: One JSON object per line
+    """
+    lines = [
+        json.dumps(dict(zip(BOOK_EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False)
+        for row in rows
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def encode_csv_batch(rows: Sequence[Row], header: bool = False) -> bytes:
+    """
+    Serialize rows as CSV lines.
+
+    Args:
+        rows: Rows of BOOK_EXPORT_FIELDS
+        header: Prepend the header row
+
+    Returns:
+        bytes: CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(BOOK_EXPORT_FIELDS)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def stream_book_export(format: str, batch_size: int,
+                             filters: Dict[str, Optional[str]]) -> AsyncIterator[bytes]:
+    """
+    Produce the catalog export body chunk by chunk.
+
+    The export owns its session for the lifetime of the response and emits
+    one chunk per cursor batch, so memory use depends on ``batch_size`` and
+    not on the size of the catalog.
+
+    Args:
+        format: "ndjson" or "csv"
+        batch_size: Rows fetched and serialized per chunk
+        filters: genre, author, title and q filters
+
+    Yields:
+        bytes: Serialized rows
+    """
+    if format == "csv":
+        yield encode_csv_batch([], header=True)
+
+    async with open_session() as db:
+        async for rows in AsyncBookService(db).iter_export_batches(batch_size, **filters):
+            if format == "csv":
+                yield encode_csv_batch(rows)
+            else:
+                yield encode_ndjson_batch(rows)
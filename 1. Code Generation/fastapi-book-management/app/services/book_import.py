@@ -0,0 +1,221 @@
+"""
+Streaming parsers and batching for bulk book imports.
+"""
+
+import codecs
+import csv
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Tuple
+
+from ..schemas.book import BookImportResult
+
+# (line number, raw record) pairs as produced by the parsers
+ImportRecord = Tuple[int, Any]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Split a byte stream into numbered text lines without buffering the whole body.
+
+    Args:
+        stream: Request body chunks
+
+    Yields:
+        Tuple[int, str]: 1-based line number and the line without its newline
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    line_number = 0
+
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+async def iter_ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """
+    Parse newline-delimited JSON objects from a byte stream.
+
+    Lines that are not valid JSON are yielded as strings so the caller can
+    report them per row.
+
+    Args:
+        stream: Request body chunks
+
+    Yields:
+        ImportRecord: Line number and the decoded object (or the raw line on error)
+    """
+    async for line_number, line in iter_lines(stream):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, line
+
+
+class _NeedMoreLines(Exception):
+    """Raised to the CSV reader when a record continues past the lines received so far."""
+
+
+class _LineFeed:
+    """
+    Lines handed to one ``csv.reader`` as they arrive from the stream.
+
+    The reader pulls the lines itself, so it alone decides where a record ends
+    (quoted fields may span lines, a bare quote inside an unquoted field is
+    literal). When it asks for a line that has not arrived yet, the lines of
+    the partial record are put back and parsed again once more have arrived.
+    """
+
+    def __init__(self):
+        self.pending: Deque[Tuple[int, str]] = deque()
+        self.record: List[Tuple[int, str]] = []
+        self.closed = False
+        self.exhausted = False
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            if self.closed:
+                self.exhausted = True
+                raise StopIteration
+            raise _NeedMoreLines
+        line = self.pending.popleft()
+        self.record.append(line)
+        # The newline is kept so a quoted field spanning lines keeps it too
+        return line[1] + "\n"
+
+    def rewind(self) -> None:
+        """Put the lines of the partial record back, to be parsed again."""
+        self.pending.extendleft(reversed(self.record))
+        self.record = []
+
+
+async def iter_csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[ImportRecord]:
+    """
+    Parse CSV records (first row is the header) from a byte stream.
+
+    Quoted fields may span lines. Records that cannot be parsed are yielded as
+    strings so the caller can report them per row.
+
+    Args:
+        stream: Request body chunks
+
+    Yields:
+        ImportRecord: Starting line number and the record as a dict
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header: List[str] = []
+    # Buffered lines needed before parsing again after a record ran past them;
+    # doubling keeps a record spanning many lines linear to parse
+    retry_at = 1
+
+    def parse_available() -> List[ImportRecord]:
+        nonlocal header, retry_at
+        records: List[ImportRecord] = []
+        while feed.pending:
+            feed.record = []
+            try:
+                values = next(reader)
+            except _NeedMoreLines:
+                feed.rewind()
+                retry_at = 2 * len(feed.pending)
+                break
+            except StopIteration:
+                break
+            except csv.Error as e:
+                records.append((feed.record[0][0], str(e)))
+                continue
+            retry_at = 1
+
+            start_line = feed.record[0][0]
+            if feed.exhausted:
+                records.append((start_line, "Unterminated quoted field"))
+            elif not values or (len(values) == 1 and not values[0].strip()):
+                continue
+            elif not header:
+                header = [name.strip() for name in values]
+            else:
+                # CSV has no null: an empty cell means the optional field is absent
+                records.append((start_line, {name: (value if value != "" else None)
+                                             for name, value in zip(header, values)}))
+        return records
+
+    async for line in iter_lines(stream):
+        feed.pending.append(line)
+        if len(feed.pending) >= retry_at:
+            for record in parse_available():
+                yield record
+
+    feed.closed = True
+    for record in parse_available():
+        yield record
+
+
+def normalize_record(record: Any) -> Dict[str, Any]:
+    """
+    Check that a parsed record can be validated as ``BookCreate``.
+
+    Args:
+        record: Decoded JSON object or CSV row
+
+    Returns:
+        Dict[str, Any]: The record
+
+    Raises:
+        ValueError: If the record is malformed or not an object
+    """
+    if isinstance(record, str):
+        raise ValueError(f"Malformed record: {record[:100]}")
+    if not isinstance(record, dict):
+        raise ValueError("Each record must be an object")
+    return record
+
+
+async def import_book_stream(book_service, records: AsyncIterator[ImportRecord],
+                             batch_size: int, max_errors: int) -> BookImportResult:
+    """
+    Feed parsed records to ``book_service.import_books`` in batches.
+
+    Args:
+        book_service: AsyncBookService bound to the request's session
+        records: Parsed records with their line numbers
+        batch_size: Records per validation/insert batch
+        max_errors: Maximum number of row errors included in the result
+
+    Returns:
+        BookImportResult: Totals and per-row errors for the whole stream
+    """
+    result = BookImportResult()
+    batch: List[ImportRecord] = []
+
+    async def flush():
+        batch_result = await book_service.import_books(batch)
+        result.received += batch_result.received
+        result.imported += batch_result.imported
+        result.failed += batch_result.failed
+        result.errors.extend(batch_result.errors[:max(0, max_errors - len(result.errors))])
+        batch.clear()
+
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    result.errors_truncated = result.failed > len(result.errors)
+    return result
@@ -1,9 +1,100 @@
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+import csv
+import io
+from sqlalchemy import Row, Select, and_, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
-
+from sqlalchemy.util import await_only
+from fastapi import Depends
+from starlette.concurrency import iterate_in_threadpool
+from pydantic import ValidationError as SchemaValidationError
+
+from ..core.cache import book_response_cache
+from ..core.config import get_settings
+from ..core.database import get_session
+from ..core.exceptions import ValidationError
+from ..core.read_replicas import get_read_session
+from ..core.pagination import Page, keyset_paginate
+from ..core.search import apply_search
+from ..core.single_flight import SingleFlight
 from ..models.book import Book
-from ..schemas.book import BookCreate, BookUpdate
+from ..models.user_book_status import UserBookStatus
+from ..schemas.book import BookCreate, BookUpdate, BookImportError, BookImportResult, BookResponse, BookWithReadStatus
+from .base import AsyncService, commit_or_conflict
+from .book_import import normalize_record
+from .reading_stats import recount_reading_stats
+
+settings = get_settings()
+
+# Columns books can be ordered and keyset-paginated by
+BOOK_SORT_COLUMNS = {
+    "id": Book.id,
+    "title": Book.title,
+    "author": Book.author,
+    "published_year": Book.published_year,
+}
+BOOK_SORT_PATTERN = "^-?(" + "|".join(BOOK_SORT_COLUMNS) + ")$"
+
+# Columns of BookResponse, selected by the row projection of list endpoints
+BOOK_RESPONSE_COLUMNS = [getattr(Book, field) for field in BookResponse.model_fields]
+BOOK_RESPONSE_FIELDS = tuple(BookResponse.model_fields)
+
+# Identical concurrent catalog reads share one database call
+book_single_flight = SingleFlight("books", enabled=settings.READ_COALESCING)
+
+# Conflict message per unique column of books
+BOOK_CONFLICTS = {"isbn": "Book with this ISBN already exists"}
+
+# Columns written by the catalog export, in output order
+BOOK_EXPORT_FIELDS = [
+    "id", "title", "author", "published_year", "genre",
+    "description", "isbn", "created_at", "updated_at",
+]
+
+
+def parse_book_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a ``fields=`` sparse fieldset.
+
+    Args:
+        fields: Comma-separated BookResponse field names, or None for all fields
+
+    Returns:
+        Optional[Tuple[str, ...]]: Distinct field names in BookResponse order, None for all fields
+
+    Raises:
+        ValidationError: If a name is not a BookResponse field or none is given
+    """
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names.difference(BOOK_RESPONSE_FIELDS)
+    if unknown:
+        raise ValidationError(f"Unknown book fields: {', '.join(sorted(unknown))}; "
+                              f"choose from {', '.join(BOOK_RESPONSE_FIELDS)}")
+    if not names:
+        raise ValidationError("fields must name at least one book field")
+    return tuple(name for name in BOOK_RESPONSE_FIELDS if name in names)
+
+
+def project_books(query, *extra_columns, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Run a ``Book`` query as plain BookResponse columns and return the rows as dicts.
+
+    Rows are not loaded as entities, so they skip the identity map and can be
+    encoded without per-item model validation.
+
+    Args:
+        query: ORM query selecting ``Book``
+        *extra_columns: Columns appended to every row (e.g. from a joined table)
+        fields: Select only these BookResponse fields (default: all of them)
+
+    Returns:
+        List[Dict[str, Any]]: One dict per book, keyed by field name
+    """
+    columns = [getattr(Book, field) for field in fields] if fields else BOOK_RESPONSE_COLUMNS
+    return [row._asdict() for row in query.with_entities(*columns, *extra_columns)]
 
 
 class BookService:
@@ -23,19 +114,13 @@ class BookService:
             Book: The created book
 
         Raises:
-            HTTPException: If ISBN already exists
+            ConflictError: If ISBN already exists
         """
-        # Check if ISBN already exists
-        if book_create.isbn and self.db.query(Book).filter(Book.isbn == book_create.isbn).first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Book with this ISBN already exists"
-            )
-
-        db_book = Book(**book_create.model_dump())
+        # updated_at is set explicitly so the write does not need a follow-up SELECT for it
+        db_book = Book(**book_create.model_dump(), updated_at=None)
         self.db.add(db_book)
-        self.db.commit()
-        self.db.refresh(db_book)
+        # The unique index on isbn rejects duplicates; id and created_at come back via RETURNING
+        commit_or_conflict(self.db, "books", BOOK_CONFLICTS)
 
         return db_book
 
@@ -52,7 +137,9 @@ class BookService:
         return self.db.query(Book).filter(Book.id == book_id).first()
 
     def get_books(self, skip: int = 0, limit: int = 100, genre: Optional[str] = None,
-                  author: Optional[str] = None, title: Optional[str] = None) -> List[Book]:
+                  author: Optional[str] = None, title: Optional[str] = None,
+                  q: Optional[str] = None, as_rows: bool = False,
+                  fields: Optional[Sequence[str]] = None) -> List[Any]:
         """
         Get books with optional filtering.
 
@@ -62,20 +149,80 @@ class BookService:
             genre: Filter by genre
             author: Filter by author
             title: Filter by title (partial match)
+            q: Full-text search over title, author and genre (ranked by relevance)
+            as_rows: Return dicts of BookResponse fields instead of entities
+            fields: Select only these BookResponse fields' columns and return dicts (implies ``as_rows``)
 
         Returns:
-            List[Book]: List of books
+            List[Book]: List of books (dicts with ``as_rows`` or ``fields``)
         """
-        query = self.db.query(Book)
+        # Book.id orders the listing (breaks ties in relevance with ``q``), so the
+        # page does not depend on which index the selected columns let the planner use
+        query = self._filtered_query(genre=genre, author=author, title=title, q=q, rank=True)
+        query = query.order_by(Book.id).offset(skip).limit(limit)
+        return project_books(query, fields=fields) if as_rows or fields else query.all()
+
+    def get_books_with_read_status(self, user_id: int, skip: int = 0, limit: int = 100,
+                                   genre: Optional[str] = None, author: Optional[str] = None,
+                                   title: Optional[str] = None, q: Optional[str] = None,
+                                   as_rows: bool = False) -> List[Any]:
+        """
+        Get books annotated with a user's reading status.
 
-        if genre:
-            query = query.filter(Book.genre.ilike(f"%{genre}%"))
-        if author:
-            query = query.filter(Book.author.ilike(f"%{author}%"))
-        if title:
-            query = query.filter(Book.title.ilike(f"%{title}%"))
+        The statuses come from a LEFT OUTER JOIN on ``user_book_status`` in
+        the same statement, so a page costs one query whatever its size.
+        Books the user does not track have ``is_read`` and ``read_at`` None.
+
+        Args:
+            user_id: User whose reading status is joined
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            genre: Filter by genre
+            author: Filter by author
+            title: Filter by title (partial match)
+            q: Full-text search over title, author and genre (ranked by relevance)
+            as_rows: Return dicts of BookWithReadStatus fields instead of models
+
+        Returns:
+            List[BookWithReadStatus]: Books with the user's reading status (dicts with ``as_rows``)
+        """
+        query = (
+            self._filtered_query(genre=genre, author=author, title=title, q=q, rank=True)
+            .outerjoin(UserBookStatus, and_(UserBookStatus.book_id == Book.id,
+                                            UserBookStatus.user_id == user_id))
+            .order_by(Book.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = project_books(query, UserBookStatus.is_read, UserBookStatus.read_at)
+        return rows if as_rows else [BookWithReadStatus.model_validate(row) for row in rows]
+
+    def get_books_page(self, cursor: Optional[str] = None, limit: int = 100, sort: str = "id",
+                       genre: Optional[str] = None, author: Optional[str] = None,
+                       title: Optional[str] = None, q: Optional[str] = None,
+                       total: str = "none") -> Page:
+        """
+        Get one keyset-paginated page of books with optional filtering.
+
+        Args:
+            cursor: Cursor of the previous page (None for the first page)
+            limit: Maximum number of records to return
+            sort: Sort key from BOOK_SORT_COLUMNS, prefixed with "-" for descending
+            genre: Filter by genre
+            author: Filter by author
+            title: Filter by title (partial match)
+            q: Full-text search over title, author and genre (results keep the sort order)
+            total: How to compute the total count, one of TOTAL_MODES
+
+        Returns:
+            Page: Books, the cursor of the next page and the total when requested
 
-        return query.offset(skip).limit(limit).all()
+        Raises:
+            ValidationError: If the cursor is invalid
+        """
+        query = self._filtered_query(genre=genre, author=author, title=title, q=q)
+        return keyset_paginate(query, sort, BOOK_SORT_COLUMNS[sort.lstrip("-")], Book.id,
+                               cursor=cursor, limit=limit, total=total)
 
     def update_book(self, book_id: int, book_update: BookUpdate) -> Optional[Book]:
         """
@@ -89,31 +236,18 @@ class BookService:
             Book: Updated book or None if not found
 
         Raises:
-            HTTPException: If ISBN already exists for another book
+            ConflictError: If ISBN already exists for another book
         """
         db_book = self.get_book(book_id)
         if not db_book:
             return None
 
-        # Check if ISBN already exists for another book
-        update_data = book_update.model_dump(exclude_unset=True)
-        if "isbn" in update_data and update_data["isbn"]:
-            existing_book = self.db.query(Book).filter(
-                Book.isbn == update_data["isbn"],
-                Book.id != book_id
-            ).first()
-            if existing_book:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Book with this ISBN already exists"
-                )
-
         # Update book fields
-        for field, value in update_data.items():
+        for field, value in book_update.model_dump(exclude_unset=True).items():
             setattr(db_book, field, value)
 
-        self.db.commit()
-        self.db.refresh(db_book)
+        # The unique index on isbn rejects duplicates; updated_at comes back via RETURNING
+        commit_or_conflict(self.db, "books", BOOK_CONFLICTS)
 
         return db_book
 
@@ -131,13 +265,23 @@ class BookService:
         if not db_book:
             return False
 
+        readers = []
+        if settings.READING_STATS_COUNTERS:
+            readers = self.db.scalars(
+                select(UserBookStatus.user_id).where(UserBookStatus.book_id == book_id)
+            ).all()
+
         self.db.delete(db_book)
+        if readers:
+            # Statuses are removed by the cascade; bring the readers' counters back in line
+            self.db.flush()
+            recount_reading_stats(self.db, readers)
         self.db.commit()
 
         return True
 
     def get_books_count(self, genre: Optional[str] = None, author: Optional[str] = None,
-                       title: Optional[str] = None) -> int:
+                       title: Optional[str] = None, q: Optional[str] = None) -> int:
         """
         Get total count of books with optional filtering.
 
@@ -145,12 +289,150 @@ class BookService:
             genre: Filter by genre
             author: Filter by author
             title: Filter by title (partial match)
+            q: Full-text search over title, author and genre
 
         Returns:
             int: Total count of books
         """
+        return self._filtered_query(genre=genre, author=author, title=title, q=q).count()
+
+    def get_export_statement(self, genre: Optional[str] = None, author: Optional[str] = None,
+                             title: Optional[str] = None, q: Optional[str] = None) -> Select:
+        """
+        Build the catalog export query with optional filtering.
+
+        Plain columns are selected instead of ``Book`` entities so streamed
+        rows are not added to the session's identity map.
+
+        Args:
+            genre: Filter by genre
+            author: Filter by author
+            title: Filter by title (partial match)
+            q: Full-text search over title, author and genre
+
+        Returns:
+            Select: Statement returning BOOK_EXPORT_FIELDS ordered by ID
+        """
+        query = self._filtered_query(genre=genre, author=author, title=title, q=q)
+        columns = [getattr(Book, field) for field in BOOK_EXPORT_FIELDS]
+        return query.with_entities(*columns).order_by(Book.id).statement
+
+    def iter_export_batches(self, batch_size: int, genre: Optional[str] = None,
+                            author: Optional[str] = None, title: Optional[str] = None,
+                            q: Optional[str] = None) -> Iterator[Sequence[Row]]:
+        """
+        Stream the catalog export in batches from a server-side cursor.
+
+        Args:
+            batch_size: Rows fetched from the cursor per batch
+            genre: Filter by genre
+            author: Filter by author
+            title: Filter by title (partial match)
+            q: Full-text search over title, author and genre
+
+        Yields:
+            Sequence[Row]: Up to ``batch_size`` rows of BOOK_EXPORT_FIELDS
+        """
+        statement = self.get_export_statement(genre=genre, author=author, title=title, q=q)
+        # yield_per implies stream_results: rows are fetched as the consumer advances
+        result = self.db.execute(statement.execution_options(yield_per=batch_size))
+        yield from result.partitions()
+
+    def import_books(self, records: Sequence[Tuple[int, Any]]) -> BookImportResult:
+        """
+        Validate and insert one batch of imported books.
+
+        Records are validated with ``BookCreate``; ISBN conflicts with existing
+        books are found with a single ``IN`` query and duplicates inside the
+        batch are rejected. Valid rows are written with one bulk insert (COPY
+        on PostgreSQL) and committed together.
+
+        Args:
+            records: (line number, raw record) pairs
+
+        Returns:
+            BookImportResult: Counts and per-row errors for the batch
+        """
+        result = BookImportResult(received=len(records))
+        books: List[Tuple[int, BookCreate]] = []
+
+        for line, record in records:
+            try:
+                books.append((line, BookCreate.model_validate(normalize_record(record))))
+            except SchemaValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+                result.errors.append(BookImportError(line=line, error=message))
+            except ValueError as e:
+                result.errors.append(BookImportError(line=line, error=str(e)))
+
+        isbns = {book.isbn for _, book in books if book.isbn}
+        existing_isbns = set(self.db.scalars(select(Book.isbn).where(Book.isbn.in_(isbns)))) if isbns else set()
+
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        seen_isbns = set()
+        for line, book in books:
+            if book.isbn in existing_isbns:
+                result.errors.append(BookImportError(line=line, error="Book with this ISBN already exists",
+                                                     isbn=book.isbn))
+                continue
+            if book.isbn and book.isbn in seen_isbns:
+                result.errors.append(BookImportError(line=line, error="Duplicate ISBN in this import",
+                                                     isbn=book.isbn))
+                continue
+            if book.isbn:
+                seen_isbns.add(book.isbn)
+            rows.append((line, book.model_dump()))
+
+        if rows:
+            try:
+                self._bulk_insert([row for _, row in rows])
+                self.db.commit()
+                result.imported = len(rows)
+            except IntegrityError as e:
+                # A concurrent writer took one of the ISBNs after the conflict check
+                self.db.rollback()
+                for line, row in rows:
+                    result.errors.append(BookImportError(line=line, error=f"Batch rejected by the database: {e.orig}",
+                                                         isbn=row.get("isbn")))
+
+        result.errors.sort(key=lambda error: error.line)
+        result.failed = result.received - result.imported
+        return result
+
+    def _bulk_insert(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows in bulk: COPY on PostgreSQL, a batched executemany elsewhere."""
+        connection = self.db.connection()
+        dialect = connection.dialect
+        columns = list(BookCreate.model_fields)
+
+        if settings.BOOK_IMPORT_USE_COPY and dialect.name == "postgresql":
+            dbapi_connection = connection.connection
+            if dialect.driver == "psycopg2":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows([row[column] for column in columns] for row in rows)
+                buffer.seek(0)
+                with dbapi_connection.cursor() as cursor:
+                    cursor.copy_expert(f"COPY books ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+                return
+            if dialect.driver == "asyncpg":
+                # Runs inside run_sync's greenlet, so the coroutine can be awaited in place
+                await_only(dbapi_connection.driver_connection.copy_records_to_table(
+                    "books", records=[tuple(row[column] for column in columns) for row in rows], columns=columns
+                ))
+                return
+
+        self.db.execute(insert(Book), rows)
+
+    def _filtered_query(self, genre: Optional[str] = None, author: Optional[str] = None,
+                        title: Optional[str] = None, q: Optional[str] = None, rank: bool = False):
+        """Build the book query with the optional filters and full-text search applied."""
         query = self.db.query(Book)
 
+        if q:
+            query = apply_search(query, q, self.db.get_bind().dialect.name, rank=rank)
+
         if genre:
             query = query.filter(Book.genre.ilike(f"%{genre}%"))
         if author:
@@ -158,4 +440,105 @@ class BookService:
         if title:
             query = query.filter(Book.title.ilike(f"%{title}%"))
 
-        return query.count()
\ No newline at end of file
+        return query
+
+
+class AsyncBookService(AsyncService):
+    """
+    Asyncio variant of BookService for use from request handlers.
+
+    Identical concurrent catalog reads are coalesced. Catalog writes
+    invalidate the book response cache and the in-flight reads once
+    committed.
+    """
+
+    sync_service = BookService
+    coalesced_methods = ("get_book", "get_books", "get_books_page", "get_books_count")
+    single_flight = book_single_flight
+
+    async def create_book(self, book_create: BookCreate) -> Book:
+        book = await self.run_sync_method("create_book", book_create)
+        await self._catalog_changed()
+        return book
+
+    async def update_book(self, book_id: int, book_update: BookUpdate) -> Optional[Book]:
+        book = await self.run_sync_method("update_book", book_id, book_update)
+        if book is not None:
+            await self._catalog_changed()
+        return book
+
+    async def delete_book(self, book_id: int) -> bool:
+        deleted = await self.run_sync_method("delete_book", book_id)
+        if deleted:
+            await self._catalog_changed()
+        return deleted
+
+    async def import_books(self, records: Sequence[Tuple[int, Any]]) -> BookImportResult:
+        result = await self.run_sync_method("import_books", records)
+        if result.imported:
+            await self._catalog_changed()
+        return result
+
+    def detach_result(self, name: str, result: Any) -> Any:
+        # Entities become BookResponse models; row dicts and counts are plain already
+        if isinstance(result, Book):
+            return BookResponse.model_validate(result)
+        if isinstance(result, Page):
+            return result._replace(items=[self.detach_result(name, item) for item in result.items])
+        if isinstance(result, list):
+            return [self.detach_result(name, item) for item in result]
+        return result
+
+    async def _catalog_changed(self) -> None:
+        """Drop cached responses and in-flight reads that may predate a committed write."""
+        book_single_flight.forget()
+        await book_response_cache.invalidate()
+
+    async def iter_export_batches(self, batch_size: int, **filters: Optional[str]) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream the catalog export without blocking the event loop.
+
+        Args:
+            batch_size: Rows fetched from the cursor per batch
+            **filters: genre, author, title and q filters of BookService.iter_export_batches
+
+        Yields:
+            Sequence[Row]: Up to ``batch_size`` rows of BOOK_EXPORT_FIELDS
+        """
+        if isinstance(self.db, AsyncSession):
+            statement = BookService(self.db.sync_session).get_export_statement(**filters)
+            result = await self.db.stream(statement.execution_options(yield_per=batch_size))
+            async for batch in result.partitions():
+                yield batch
+            return
+
+        batches = BookService(self.db).iter_export_batches(batch_size, **filters)
+        async for batch in iterate_in_threadpool(batches):
+            yield batch
+
+
+def get_book_service(db=Depends(get_session)) -> AsyncBookService:
+    """
+    BookService dependency for FastAPI.
+
+    Args:
+        db: Database session selected by the ASYNC_DATABASE setting
+
+    Returns:
+        AsyncBookService: Service bound to the request's database session
+    """
+    return AsyncBookService(db)
+
+
+def get_read_book_service(db=Depends(get_read_session)) -> AsyncBookService:
+    """
+    BookService dependency for read-only endpoints.
+
+    Args:
+        db: Session on a read replica, or on the primary when none is
+            configured or available or the client wrote recently
+
+    Returns:
+        AsyncBookService: Service bound to the request's read session
+    """
+    return AsyncBookService(db)
@@ -0,0 +1,114 @@
+"""
+Per-user reading statistics: the aggregate query and the maintained counters.
+
+With ``READING_STATS_COUNTERS`` enabled every write to ``user_book_status``
+also adjusts the user's ``user_reading_stats`` row in the same transaction,
+so reading the stats is a primary-key lookup. Writers lock the counter row
+first, which serializes concurrent status updates of the same user and keeps
+the deltas exact.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import get_settings
+from ..models.user_book_status import UserBookStatus
+from ..models.user_reading_stats import UserReadingStats
+
+settings = get_settings()
+
+
+def count_reading_stats(db: Session, user_id: int) -> Tuple[int, int]:
+    """
+    Count a user's tracked and read books with one conditional-aggregate query.
+
+    Args:
+        db: Database session
+        user_id: User ID
+
+    Returns:
+        Tuple[int, int]: Total tracked books and read books
+    """
+    total_books, read_books = db.execute(
+        select(
+            func.count(),
+            func.count(case((UserBookStatus.is_read == True, 1))),
+        ).where(UserBookStatus.user_id == user_id)
+    ).one()
+    return total_books, read_books
+
+
+def format_reading_stats(total_books: int, read_books: int) -> Dict[str, float]:
+    """
+    Build the statistics payload returned by ``/users/me/stats``.
+
+    Args:
+        total_books: Total tracked books
+        read_books: Books marked as read
+
+    Returns:
+        dict: Reading statistics
+    """
+    return {
+        "total_books": total_books,
+        "read_books": read_books,
+        "unread_books": total_books - read_books,
+        "reading_percentage": round((read_books / total_books) * 100, 2) if total_books > 0 else 0
+    }
+
+
+def lock_reading_stats(db: Session, user_id: int) -> UserReadingStats:
+    """
+    Lock a user's counter row for update, creating it from the aggregate if missing.
+
+    Args:
+        db: Database session
+        user_id: User ID
+
+    Returns:
+        UserReadingStats: The locked counter row
+    """
+    stats = db.get(UserReadingStats, user_id, with_for_update=True)
+    if stats is not None:
+        return stats
+
+    total_books, read_books = count_reading_stats(db, user_id)
+    stats = UserReadingStats(user_id=user_id, total_books=total_books, read_books=read_books)
+    try:
+        with db.begin_nested():
+            db.add(stats)
+    except IntegrityError:
+        # Another transaction created the row first; wait for its lock instead
+        stats = db.get(UserReadingStats, user_id, with_for_update=True, populate_existing=True)
+    return stats
+
+
+def recount_reading_stats(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Recompute the counter rows of several users from ``user_book_status``.
+
+    Used by writes that remove statuses of many users at once, such as
+    deleting a book.
+
+    Args:
+        db: Database session
+        user_ids: Users whose counters changed
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    statuses = select(UserBookStatus.id).where(UserBookStatus.user_id == UserReadingStats.user_id)
+    db.execute(
+        update(UserReadingStats)
+        .where(UserReadingStats.user_id.in_(user_ids))
+        .values(
+            total_books=statuses.with_only_columns(func.count(UserBookStatus.id)).scalar_subquery(),
+            read_books=statuses.with_only_columns(func.count(UserBookStatus.id))
+            .where(UserBookStatus.is_read == True).scalar_subquery(),
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -1,11 +1,31 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
-from fastapi import HTTPException, status
+from fastapi import Depends, HTTPException, status
 
+from ..core.config import get_settings
+from ..core.database import get_session
+from ..core.read_replicas import get_read_session
+from ..core.pagination import Page, keyset_paginate
 from ..models.user import User
 from ..models.book import Book
 from ..models.user_book_status import UserBookStatus
+from ..models.user_reading_stats import UserReadingStats
+from ..schemas.user_book_status import UserBookStatusBatchResult, UserBookStatusCreate, UserBookStatusResponse
+from .base import AsyncService
+from .book_service import BOOK_SORT_COLUMNS, project_books
+from .reading_stats import count_reading_stats, format_reading_stats, lock_reading_stats
+
+settings = get_settings()
+
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
 
 
 class UserBookService:
@@ -14,7 +34,7 @@ class UserBookService:
     def __init__(self, db: Session):
         self.db = db
 
-    def mark_book_as_read(self, user_id: int, book_id: int) -> UserBookStatus:
+    def mark_book_as_read(self, user_id: int, book_id: int) -> UserBookStatusResponse:
         """
         Mark a book as read for a user.
 
@@ -23,43 +43,14 @@ class UserBookService:
             book_id: Book ID
 
         Returns:
-            UserBookStatus: The updated or created status
+            UserBookStatusResponse: The updated or created status
 
         Raises:
             HTTPException: If book doesn't exist
         """
-        # Check if book exists
-        book = self.db.query(Book).filter(Book.id == book_id).first()
-        if not book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Book not found"
-            )
-
-        # Get or create user book status
-        user_book_status = self.db.query(UserBookStatus).filter(
-            UserBookStatus.user_id == user_id,
-            UserBookStatus.book_id == book_id
-        ).first()
-
-        if user_book_status:
-            user_book_status.is_read = True
-            user_book_status.read_at = datetime.utcnow()
-        else:
-            user_book_status = UserBookStatus(
-                user_id=user_id,
-                book_id=book_id,
-                is_read=True,
-                read_at=datetime.utcnow()
-            )
-            self.db.add(user_book_status)
-
-        self.db.commit()
-        self.db.refresh(user_book_status)
+        return self._set_book_status(user_id, book_id, True)
 
-        return user_book_status
-
-    def mark_book_as_unread(self, user_id: int, book_id: int) -> UserBookStatus:
+    def mark_book_as_unread(self, user_id: int, book_id: int) -> UserBookStatusResponse:
         """
         Mark a book as unread for a user.
 
@@ -68,43 +59,40 @@ class UserBookService:
             book_id: Book ID
 
         Returns:
-            UserBookStatus: The updated or created status
+            UserBookStatusResponse: The updated or created status
 
         Raises:
             HTTPException: If book doesn't exist
         """
-        # Check if book exists
-        book = self.db.query(Book).filter(Book.id == book_id).first()
-        if not book:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Book not found"
-            )
+        return self._set_book_status(user_id, book_id, False)
 
-        # Get or create user book status
-        user_book_status = self.db.query(UserBookStatus).filter(
-            UserBookStatus.user_id == user_id,
-            UserBookStatus.book_id == book_id
-        ).first()
+    def set_reading_statuses(self, user_id: int,
+                             items: Sequence[UserBookStatusCreate]) -> UserBookStatusBatchResult:
+        """
+        Set the read state of several books for a user in one transaction.
 
-        if user_book_status:
-            user_book_status.is_read = False
-            user_book_status.read_at = None
-        else:
-            user_book_status = UserBookStatus(
-                user_id=user_id,
-                book_id=book_id,
-                is_read=False
-            )
-            self.db.add(user_book_status)
+        Book existence is checked with a single ``IN`` query and all statuses
+        are written by one upsert on the ``unique_user_book`` constraint. When
+        a book ID appears more than once, the last item wins.
+
+        Args:
+            user_id: User ID
+            items: Book IDs and their new read state
 
+        Returns:
+            UserBookStatusBatchResult: Written statuses and the IDs of unknown books
+        """
+        requested = {item.book_id: item.is_read for item in items}
+        statuses, missing_book_ids = self._write_statuses(user_id, requested)
         self.db.commit()
-        self.db.refresh(user_book_status)
 
-        return user_book_status
+        return UserBookStatusBatchResult(
+            statuses=[UserBookStatusResponse.model_validate(user_book_status) for user_book_status in statuses],
+            missing_book_ids=missing_book_ids
+        )
 
     def get_user_books_with_status(self, user_id: int, is_read: Optional[bool] = None,
-                                  skip: int = 0, limit: int = 100) -> List[Book]:
+                                  skip: int = 0, limit: int = 100, as_rows: bool = False) -> List[Any]:
         """
         Get books with reading status for a user.
 
@@ -113,18 +101,37 @@ class UserBookService:
             is_read: Filter by read status (None for all books)
             skip: Number of records to skip
             limit: Maximum number of records to return
+            as_rows: Return dicts of BookResponse fields instead of entities
 
         Returns:
-            List[Book]: List of books with reading status
+            List[Book]: List of books with reading status (dicts with ``as_rows``)
         """
-        query = self.db.query(Book).join(UserBookStatus).filter(
-            UserBookStatus.user_id == user_id
-        )
+        query = self._user_books_query(user_id, is_read).offset(skip).limit(limit)
+        return project_books(query) if as_rows else query.all()
 
-        if is_read is not None:
-            query = query.filter(UserBookStatus.is_read == is_read)
+    def get_user_books_page(self, user_id: int, is_read: Optional[bool] = None,
+                            cursor: Optional[str] = None, limit: int = 100,
+                            sort: str = "id", total: str = "none") -> Page:
+        """
+        Get one keyset-paginated page of books tracked by a user.
+
+        Args:
+            user_id: User ID
+            is_read: Filter by read status (None for all books)
+            cursor: Cursor of the previous page (None for the first page)
+            limit: Maximum number of records to return
+            sort: Sort key from BOOK_SORT_COLUMNS, prefixed with "-" for descending
+            total: How to compute the total count, one of TOTAL_MODES
 
-        return query.offset(skip).limit(limit).all()
+        Returns:
+            Page: Books, the cursor of the next page and the total when requested
+
+        Raises:
+            ValidationError: If the cursor is invalid
+        """
+        query = self._user_books_query(user_id, is_read)
+        return keyset_paginate(query, sort, BOOK_SORT_COLUMNS[sort.lstrip("-")], Book.id,
+                               cursor=cursor, limit=limit, total=total)
 
     def get_book_reading_status(self, user_id: int, book_id: int) -> Optional[UserBookStatus]:
         """
@@ -146,26 +153,162 @@ class UserBookService:
         """
         Get reading statistics for a user.
 
+        With READING_STATS_COUNTERS enabled this is a primary-key lookup of the
+        user's counter row; otherwise both counts come from one aggregate query.
+
         Args:
             user_id: User ID
 
         Returns:
             dict: Reading statistics
         """
-        total_books = self.db.query(UserBookStatus).filter(
+        if settings.READING_STATS_COUNTERS:
+            stats = self.db.get(UserReadingStats, user_id)
+            if stats is not None:
+                return format_reading_stats(stats.total_books, stats.read_books)
+
+        return format_reading_stats(*count_reading_stats(self.db, user_id))
+
+    def _set_book_status(self, user_id: int, book_id: int, is_read: bool) -> UserBookStatusResponse:
+        """Upsert the status of one book, raising 404 if the book does not exist."""
+        statuses, missing_book_ids = self._write_statuses(user_id, {book_id: is_read})
+        if missing_book_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Book not found"
+            )
+
+        self.db.commit()
+        return UserBookStatusResponse.model_validate(statuses[0])
+
+    def _write_statuses(self, user_id: int, requested: Dict[int, bool]) -> Tuple[List[UserBookStatus], List[int]]:
+        """
+        Upsert the requested statuses of existing books and keep the counters in step.
+
+        One query checks which books exist and what their current status is;
+        unknown books are skipped. The caller commits.
+
+        Returns:
+            Tuple[List[UserBookStatus], List[int]]: Written statuses and the sorted unknown book IDs
+        """
+        # Lock the counters before reading the current statuses so the deltas stay exact
+        stats = lock_reading_stats(self.db, user_id) if settings.READING_STATS_COUNTERS else None
+
+        current = dict(self.db.execute(
+            select(Book.id, UserBookStatus.is_read)
+            .outerjoin(UserBookStatus, and_(UserBookStatus.book_id == Book.id, UserBookStatus.user_id == user_id))
+            .where(Book.id.in_(requested))
+        ).all())
+        states = {book_id: is_read for book_id, is_read in requested.items() if book_id in current}
+
+        statuses = self._upsert_statuses(user_id, states)
+
+        if stats is not None:
+            stats.total_books += sum(1 for book_id in states if current[book_id] is None)
+            stats.read_books += sum(int(is_read) - int(bool(current[book_id])) for book_id, is_read in states.items())
+            self.db.flush()
+
+        return statuses, sorted(set(requested) - set(current))
+
+    def _upsert_statuses(self, user_id: int, states: Dict[int, bool]) -> List[UserBookStatus]:
+        """
+        Insert or update the statuses of existing books with a single statement.
+
+        Uses ``INSERT ... ON CONFLICT (user_id, book_id) DO UPDATE ... RETURNING``
+        where the dialect supports it and a get-or-create loop elsewhere. The
+        caller commits.
+        """
+        if not states:
+            return []
+
+        now = datetime.utcnow()
+        rows = [
+            {"user_id": user_id, "book_id": book_id, "is_read": is_read, "read_at": now if is_read else None}
+            for book_id, is_read in states.items()
+        ]
+
+        upsert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if upsert is None:
+            return self._merge_statuses(user_id, rows)
+
+        statement = upsert(UserBookStatus).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[UserBookStatus.user_id, UserBookStatus.book_id],
+            set_={
+                "is_read": statement.excluded.is_read,
+                "read_at": statement.excluded.read_at,
+                "updated_at": func.now(),
+            }
+        )
+        return list(self.db.scalars(
+            statement.returning(UserBookStatus),
+            execution_options={"populate_existing": True}
+        ))
+
+    def _merge_statuses(self, user_id: int, rows: List[Dict]) -> List[UserBookStatus]:
+        """Get-or-create fallback of _upsert_statuses for dialects without ON CONFLICT."""
+        existing = {
+            user_book_status.book_id: user_book_status
+            for user_book_status in self.db.query(UserBookStatus).filter(
+                UserBookStatus.user_id == user_id,
+                UserBookStatus.book_id.in_([row["book_id"] for row in rows])
+            )
+        }
+
+        statuses = []
+        for row in rows:
+            user_book_status = existing.get(row["book_id"])
+            if user_book_status:
+                user_book_status.is_read = row["is_read"]
+                user_book_status.read_at = row["read_at"]
+            else:
+                user_book_status = UserBookStatus(**row)
+                self.db.add(user_book_status)
+            statuses.append(user_book_status)
+
+        self.db.flush()
+        return statuses
+
+    def _user_books_query(self, user_id: int, is_read: Optional[bool] = None):
+        """Build the query for books tracked by a user, optionally filtered by read status."""
+        query = self.db.query(Book).join(UserBookStatus).filter(
             UserBookStatus.user_id == user_id
-        ).count()
+        )
 
-        read_books = self.db.query(UserBookStatus).filter(
-            UserBookStatus.user_id == user_id,
-            UserBookStatus.is_read == True
-        ).count()
+        if is_read is not None:
+            query = query.filter(UserBookStatus.is_read == is_read)
+
+        return query
+
+
+class AsyncUserBookService(AsyncService):
+    """Asyncio variant of UserBookService for use from request handlers."""
+
+    sync_service = UserBookService
+
+
+def get_user_book_service(db=Depends(get_session)) -> AsyncUserBookService:
+    """
+    UserBookService dependency for FastAPI.
+
+    Args:
+        db: Database session selected by the ASYNC_DATABASE setting
+
+    Returns:
+        AsyncUserBookService: Service bound to the request's database session
+    """
+    return AsyncUserBookService(db)
+
+
+def get_read_user_book_service(db=Depends(get_read_session)) -> AsyncUserBookService:
+    """
+    UserBookService dependency for read-only endpoints.
 
-        unread_books = total_books - read_books
+    Args:
+        db: Session on a read replica, or on the primary when none is
+            configured or available or the client wrote recently
 
-        return {
-            "total_books": total_books,
-            "read_books": read_books,
-            "unread_books": unread_books,
-            "reading_percentage": round((read_books / total_books) * 100, 2) if total_books > 0 else 0
-        }
\ No newline at end of file
+    Returns:
+        AsyncUserBookService: Service bound to the request's read session
+    """
+    return AsyncUserBookService(db)
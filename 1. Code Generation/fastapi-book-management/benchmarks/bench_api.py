@@ -0,0 +1,310 @@
+"""
+Load-test the API with concurrent clients across the main user flows.
+
+Seeds a throwaway SQLite database (or the one given with --database-url, e.g.
+a local PostgreSQL) with users, books and reading statuses, then drives the
+application with concurrent virtual users. Each virtual user logs in and
+repeatedly picks a flow by weight: log in again, browse the catalog, open a
+book, search, mark a book as read, or read its statistics. Latency
+percentiles and throughput per flow are printed as JSON:
+
+    python -m benchmarks.bench_api --users 50 --books 20000 --concurrency 32 --duration 30
+
+By default the ASGI app runs in-process (client and server share the event
+loop, so absolute numbers include the client's overhead); pass --url to load a
+running server instead, seeded from the same --database-url. Application
+settings are read from the environment as usual, e.g. ``ASYNC_DATABASE=true``
+or ``RESPONSE_CACHE_BACKEND=none``.
+
+Regressions: --output saves the report, and --baseline compares the run with a
+saved report and exits with status 1 when a flow's p95 latency grew by more
+than --max-regression (a fraction) or it started failing.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+API_PREFIX = "/api/v1"
+PASSWORD = "benchmark-password"
+
+# Relative frequency of each flow once logged in
+FLOW_WEIGHTS = {
+    "login": 5,
+    "browse": 40,
+    "book": 25,
+    "search": 15,
+    "mark_read": 10,
+    "stats": 10,
+}
+
+WORDS = [
+    "shadow", "river", "empire", "garden", "winter", "silent", "crown", "ocean", "machine", "forest",
+    "memory", "glass", "storm", "harbor", "signal", "desert", "lantern", "orbit", "mirror", "thunder",
+    "archive", "summer", "island", "voyage", "ember", "citadel", "hollow", "atlas", "velvet", "cipher",
+]
+GENRES = ["scifi", "fantasy", "mystery", "romance", "history", "poetry", "biography", "thriller"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50, help="Users to seed; each virtual user logs in as one")
+    parser.add_argument("--books", type=int, default=20_000, help="Catalog size to seed")
+    parser.add_argument("--statuses-per-user", type=int, default=50, help="Reading statuses seeded per user")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds run before measuring")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the data and the flows")
+    parser.add_argument("--database-url", default=None, help="Database to seed (default: temporary SQLite file)")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--output", default=None, help="Also write the report to this file")
+    parser.add_argument("--baseline", default=None, help="Report of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Allowed p95 increase over the baseline, as a fraction")
+    return parser.parse_args()
+
+
+def seed_database(args: argparse.Namespace) -> None:
+    """Create the schema and bulk insert users, books and reading statuses."""
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal, create_tables
+    from app.core.security import get_password_hash
+    from app.models.book import Book
+    from app.models.user import User
+    from app.models.user_book_status import UserBookStatus
+
+    rng = random.Random(args.seed)
+    create_tables()
+    with SessionLocal() as db:
+        # One hash for every user: hashing is deliberately slow
+        hashed_password = get_password_hash(PASSWORD)
+        db.execute(insert(User), [
+            {"username": f"bench{i}", "email": f"bench{i}@example.com", "hashed_password": hashed_password}
+            for i in range(args.users)
+        ])
+
+        books = [
+            {
+                "title": " ".join(rng.choice(WORDS) for _ in range(3)).title(),
+                "author": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+                "published_year": rng.randint(1900, 2024),
+                "genre": rng.choice(GENRES),
+            }
+            for _ in range(args.books)
+        ]
+        for start in range(0, len(books), 10_000):
+            db.execute(insert(Book), books[start:start + 10_000])
+
+        user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.username.like("bench%"))]
+        book_ids = [book_id for (book_id,) in db.query(Book.id)]
+        statuses = []
+        for user_id in user_ids:
+            for book_id in rng.sample(book_ids, min(args.statuses_per_user, len(book_ids))):
+                statuses.append({"user_id": user_id, "book_id": book_id, "is_read": rng.random() < 0.5})
+        for start in range(0, len(statuses), 10_000):
+            db.execute(insert(UserBookStatus), statuses[start:start + 10_000])
+        db.commit()
+
+
+class Recorder:
+    """Latency samples and errors per flow, kept only while measuring."""
+
+    def __init__(self):
+        self.measuring = False
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, flow: str, seconds: float, ok: bool) -> None:
+        if not self.measuring:
+            return
+        if ok:
+            self.latencies[flow].append(seconds)
+        else:
+            self.errors[flow] += 1
+
+
+async def timed(recorder: Recorder, flow: str, request) -> Optional[Any]:
+    """Send a request, record its latency under ``flow`` and return the response."""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except Exception:
+        recorder.record(flow, time.perf_counter() - start, ok=False)
+        return None
+    recorder.record(flow, time.perf_counter() - start, ok=response.status_code < 400)
+    return response
+
+
+async def login(client, recorder: Recorder, username: str) -> Optional[Dict[str, str]]:
+    """Log in as ``username``; return the authorization headers, None on failure."""
+    response = await timed(recorder, "login", client.post(
+        f"{API_PREFIX}/auth/login", data={"username": username, "password": PASSWORD}
+    ))
+    if response is None or response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def virtual_user(client, recorder: Recorder, username: str, book_count: int,
+                       rng: random.Random, deadline: float) -> None:
+    """Log in, then run weighted flows until ``deadline``."""
+    headers = await login(client, recorder, username)
+    if headers is None:
+        return
+
+    flows = list(FLOW_WEIGHTS)
+    weights = list(FLOW_WEIGHTS.values())
+    while time.perf_counter() < deadline:
+        flow = rng.choices(flows, weights)[0]
+        if flow == "login":
+            headers = await login(client, recorder, username) or headers
+            continue
+        if flow == "browse":
+            params = {"skip": rng.randrange(0, max(book_count - 20, 1)), "limit": 20}
+            if rng.random() < 0.3:
+                params["genre"] = rng.choice(GENRES)
+            request = client.get(f"{API_PREFIX}/books/", params=params)
+        elif flow == "book":
+            request = client.get(f"{API_PREFIX}/books/{rng.randint(1, book_count)}")
+        elif flow == "search":
+            request = client.get(f"{API_PREFIX}/books/", params={"q": rng.choice(WORDS), "limit": 20})
+        elif flow == "mark_read":
+            action = "read" if rng.random() < 0.7 else "unread"
+            request = client.post(f"{API_PREFIX}/users/books/{rng.randint(1, book_count)}/{action}",
+                                  headers=headers)
+        else:
+            request = client.get(f"{API_PREFIX}/users/me/stats", headers=headers)
+        await timed(recorder, flow, request)
+
+
+async def run_load(args: argparse.Namespace, recorder: Recorder) -> float:
+    """Drive the virtual users through warm-up and measurement; return measured seconds."""
+    import httpx
+
+    async def drive(client) -> float:
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        deadline = start + args.warmup + args.duration
+        users = [
+            virtual_user(client, recorder, f"bench{i % args.users}", args.books,
+                         random.Random(rng.random()), deadline)
+            for i in range(args.concurrency)
+        ]
+        tasks = [asyncio.ensure_future(user) for user in users]
+
+        await asyncio.sleep(args.warmup)
+        recorder.measuring = True
+        measure_start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        recorder.measuring = False
+        return time.perf_counter() - measure_start
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+            return await drive(client)
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=60) as client:
+            return await drive(client)
+
+
+def summarize(recorder: Recorder, seconds: float) -> Dict[str, Dict[str, Any]]:
+    """Latency percentiles (ms), error counts and throughput per flow."""
+    flows = {}
+    for flow in sorted(set(recorder.latencies) | set(recorder.errors)):
+        samples = sorted(recorder.latencies[flow])
+        summary: Dict[str, Any] = {
+            "requests": len(samples),
+            "errors": recorder.errors[flow],
+            "throughput_rps": round(len(samples) / seconds, 2),
+        }
+        if samples:
+            cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+            summary.update({
+                "p50_ms": round(cuts[49] * 1000, 3),
+                "p95_ms": round(cuts[94] * 1000, 3),
+                "p99_ms": round(cuts[98] * 1000, 3),
+                "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3),
+            })
+        flows[flow] = summary
+    return flows
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Describe the flows whose p95 regressed or that started failing."""
+    regressions = []
+    for flow, previous in baseline.get("flows", {}).items():
+        current = report["flows"].get(flow)
+        if current is None or "p95_ms" not in current or "p95_ms" not in previous:
+            continue
+        limit = previous["p95_ms"] * (1 + max_regression)
+        if current["p95_ms"] > limit:
+            regressions.append(f"{flow}: p95 {current['p95_ms']}ms > {round(limit, 3)}ms "
+                               f"(baseline {previous['p95_ms']}ms)")
+        if current["errors"] and not previous.get("errors"):
+            regressions.append(f"{flow}: {current['errors']} errors (baseline had none)")
+    return regressions
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-chars")
+    os.environ["DEBUG"] = "false"
+    os.environ.setdefault("LOG_REQUEST_SAMPLE_RATE", "0")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    seed_start = time.perf_counter()
+    seed_database(args)
+    seed_seconds = time.perf_counter() - seed_start
+
+    recorder = Recorder()
+    seconds = asyncio.run(run_load(args, recorder))
+    flows = summarize(recorder, seconds)
+
+    report = {
+        "benchmark": "api",
+        "database": os.environ["DATABASE_URL"].split(":")[0],
+        "target": args.url or "in-process",
+        "async_database": os.environ.get("ASYNC_DATABASE", "false").lower() == "true",
+        "users": args.users,
+        "books": args.books,
+        "concurrency": args.concurrency,
+        "seed_seconds": round(seed_seconds, 2),
+        "duration_seconds": round(seconds, 2),
+        "throughput_rps": round(sum(flow["requests"] for flow in flows.values()) / seconds, 2),
+        "flows": flows,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
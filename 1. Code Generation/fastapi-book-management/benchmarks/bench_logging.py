@@ -0,0 +1,124 @@
+"""
+Benchmark the per-request cost of request/response logging on the calling thread.
+
+Compares the previous synchronous set-up (stream handler on the request path,
+a formatter built per record, dicts rendered into f-strings with a fresh
+timestamp) with the queued text and JSON modes, with and without sampling.
+Queued modes are timed twice: with the writer thread running concurrently
+(it competes for the GIL, as it would in a busy worker) and with the writer
+paused, which is the pure cost on the request path; the time the writer then
+needs to drain the queue is reported separately. Results are printed as JSON:
+
+    python -m benchmarks.bench_logging --requests 50000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50_000, help="Simulated requests per mode")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Sample rate of the sampled mode")
+    return parser.parse_args()
+
+
+class PerRecordColorFormatter(logging.Formatter):
+    """The previous ColorFormatter, which built a new Formatter for every record."""
+
+    def format(self, record):
+        formatter = logging.Formatter("\x1b[38;21m%(asctime)s - %(name)s - %(levelname)s - %(message)s\x1b[0m")
+        return formatter.format(record)
+
+
+def legacy_request(logger: logging.Logger) -> None:
+    """Request and response logging as previously done by logging_middleware."""
+    request_data = {"method": "GET", "path": "/api/v1/books/", "timestamp": datetime.utcnow().isoformat(),
+                    "user_id": None, "client_ip": "127.0.0.1"}
+    logger.info(f"API Request: {request_data}")
+    response_data = {"method": "GET", "path": "/api/v1/books/", "status_code": 200,
+                     "processing_time": 0.0042, "timestamp": datetime.utcnow().isoformat()}
+    logger.info(f"API Response: {response_data}")
+
+
+def time_requests(requests: int, handle_request) -> float:
+    """Mean seconds spent on the calling thread per simulated request."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        handle_request()
+    return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-chars")
+    os.environ["DEBUG"] = "false"
+    # Large enough that no record is dropped while the writer catches up
+    os.environ["LOG_QUEUE_SIZE"] = str(args.requests * 2 + 1000)
+    os.environ["LOG_SKIP_RECORD_METADATA"] = "true"
+
+    # Every mode writes to /dev/null so the terminal does not dominate the timings
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+
+    legacy_logger = logging.getLogger("bench.legacy")
+    legacy_logger.propagate = False
+    legacy_handler = logging.StreamHandler(devnull)
+    legacy_handler.setFormatter(PerRecordColorFormatter())
+    legacy_logger.addHandler(legacy_handler)
+    legacy_logger.setLevel(logging.INFO)
+
+    results = {"requests": args.requests, "modes": []}
+    # Timed before the application sets the process-wide logging flags
+    results["modes"].append({
+        "mode": "legacy_sync",
+        "us_per_request": round(time_requests(args.requests, lambda: legacy_request(legacy_logger)) * 1e6, 2),
+    })
+
+    from app.core import logging as app_logging
+    from app.core.logging import log_api_request, log_api_response, sample_request_log
+
+    def queued_request() -> None:
+        sampled = sample_request_log()
+        if sampled:
+            log_api_request(method="GET", path="/api/v1/books/", client_ip="127.0.0.1")
+        if sampled:
+            log_api_response(method="GET", path="/api/v1/books/", status_code=200, processing_time=0.0042)
+
+    settings = app_logging.settings
+    for log_format, sample_rate in (("text", 1.0), ("json", 1.0), ("json", args.sample_rate)):
+        settings.LOG_FORMAT = log_format
+        settings.LOG_REQUEST_SAMPLE_RATE = sample_rate
+        app_logging.setup_logging()
+        concurrent_seconds = time_requests(args.requests, queued_request)
+        app_logging.shutdown_logging()
+
+        app_logging.setup_logging()
+        listener = app_logging._listener
+        listener.stop()
+        enqueue_seconds = time_requests(args.requests, queued_request)
+        drain_start = time.perf_counter()
+        listener.start()
+        app_logging.shutdown_logging()
+
+        results["modes"].append({
+            "mode": f"queued_{log_format}",
+            "sample_rate": sample_rate,
+            "us_per_request": round(concurrent_seconds * 1e6, 2),
+            "us_per_request_writer_paused": round(enqueue_seconds * 1e6, 2),
+            "writer_drain_seconds": round(time.perf_counter() - drain_start, 3),
+        })
+
+    sys.stdout = stdout
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
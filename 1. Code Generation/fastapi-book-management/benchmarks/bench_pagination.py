@@ -0,0 +1,113 @@
+"""
+Benchmark skip/limit versus keyset (cursor) pagination of GET /books.
+
+Seeds a throwaway SQLite catalog and times one page at increasing depths
+through the services behind the two endpoints, printing the results as JSON:
+
+    python -m benchmarks.bench_pagination --books 500000 --sort -title
+
+``offset_ms`` is ``BookService.get_books`` with ``skip`` (the ``GET /books/``
+path, ordered by id) and ``keyset_ms`` is ``BookService.get_books_page`` on
+the same id order, so the two read the same rows. ``keyset_sorted_ms`` pages
+on ``--sort`` instead, whose titles are spread independently of ids, to show
+that a seek on a ``(sort_key, id)`` index costs the same at any depth. Depths
+run up to 90% of the catalog, where skip/limit has to step over most rows.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=500_000, help="Catalog size to seed")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per page")
+    parser.add_argument("--sort", default="-title", help="Sort key of the keyset_sorted_ms column")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per depth")
+    parser.add_argument("--database-url", default=None, help="Database to seed (default: temporary SQLite file)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-chars")
+    os.environ["DEBUG"] = "false"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal, create_tables
+    from app.core.pagination import encode_cursor
+    from app.models.book import Book
+    from app.services.book_service import BOOK_SORT_COLUMNS, BookService
+
+    create_tables()
+    with SessionLocal() as db:
+        rows = [
+            {
+                # A stride coprime to most catalog sizes spreads titles independently of ids
+                "title": f"Title {i * 7919 % args.books:07d}",
+                "author": f"Author {i % 997:04d}",
+                "published_year": 1900 + i % 120,
+                "genre": f"genre-{i % 50}",
+            }
+            for i in range(args.books)
+        ]
+        for start in range(0, len(rows), 10_000):
+            db.execute(insert(Book), rows[start:start + 10_000])
+        db.commit()
+
+        service = BookService(db)
+        depths = sorted({0, 1_000, 10_000, *(int(args.books * share) for share in (0.25, 0.5, 0.9))})
+        depths = [depth for depth in depths if depth < args.books]
+        results = []
+
+        def cursor_at(sort: str, depth: int):
+            """Cursor of the row just before ``depth``, as a client paging this far would hold it."""
+            if not depth:
+                return None
+            sort_column = BOOK_SORT_COLUMNS[sort.lstrip("-")]
+            order = [sort_column.desc(), Book.id.desc()] if sort.startswith("-") else [sort_column, Book.id]
+            last = db.query(Book).order_by(*order).offset(depth - 1).limit(1).one()
+            values = [last.id] if sort_column is Book.id else [getattr(last, sort_column.key), last.id]
+            return encode_cursor(sort, values)
+
+        for depth in depths:
+            id_cursor, sorted_cursor = cursor_at("id", depth), cursor_at(args.sort, depth)
+
+            timings = {"offset": [], "keyset": [], "keyset_sorted": []}
+            for _ in range(args.repeats):
+                for name, fetch in (
+                    ("offset", lambda: service.get_books(skip=depth, limit=args.page_size, as_rows=True)),
+                    ("keyset", lambda: service.get_books_page(cursor=id_cursor, limit=args.page_size)),
+                    ("keyset_sorted", lambda: service.get_books_page(cursor=sorted_cursor, limit=args.page_size,
+                                                                     sort=args.sort)),
+                ):
+                    start = time.perf_counter()
+                    fetch()
+                    timings[name].append(time.perf_counter() - start)
+
+            results.append({
+                "depth": depth,
+                **{f"{name}_ms": round(statistics.median(times) * 1000, 3) for name, times in timings.items()},
+            })
+
+    print(json.dumps({
+        "benchmark": "pagination",
+        "database": os.environ["DATABASE_URL"].split(":")[0],
+        "books": args.books,
+        "page_size": args.page_size,
+        "sort": args.sort,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
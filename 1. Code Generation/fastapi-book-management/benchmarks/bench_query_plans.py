@@ -0,0 +1,208 @@
+"""
+Check that the hot queries are planned with index scans.
+
+Seeds a throwaway SQLite database (or the one given with --database-url) like
+``bench_api``, runs each hot query shape through the real services, captures
+the SQL they emit and asks the database for its plan (``EXPLAIN QUERY PLAN``
+on SQLite, ``EXPLAIN (FORMAT JSON)`` on PostgreSQL). A query fails the check
+when its plan reads a table with a full scan it should avoid (an SQLite
+skip-scan over an index prefix counts as one), reads the table rows where an
+index should cover the query, or sorts rows that an index should deliver in
+order. Plans and verdicts are printed as JSON and the exit status is 1 when
+any check fails:
+
+    python -m benchmarks.bench_query_plans --books 20000
+
+PostgreSQL prefers sequential scans on small tables whatever the indexes, so
+there the plans are taken with ``enable_seqscan`` and ``enable_sort`` off:
+the check asserts that an index *can* serve the query.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class HotQuery(NamedTuple):
+    """A query shape to check and what its plan must avoid."""
+    name: str
+    run: Callable[[Any], Any]
+    no_full_scan: Sequence[str] = ()
+    covered: Sequence[str] = ()
+    no_sort: bool = False
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50, help="Users to seed")
+    parser.add_argument("--books", type=int, default=20_000, help="Catalog size to seed")
+    parser.add_argument("--statuses-per-user", type=int, default=200, help="Reading statuses seeded per user")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the data")
+    parser.add_argument("--database-url", default=None, help="Database to seed (default: temporary SQLite file)")
+    return parser.parse_args()
+
+
+def hot_queries(user_id: int, book_id: int) -> List[HotQuery]:
+    """The query shapes behind the busiest endpoints."""
+    from app.models.book import Book
+    from app.services.book_service import BookService
+    from app.services.reading_stats import count_reading_stats
+    from app.services.user_book_service import UserBookService
+
+    def second_page(db, sort: str):
+        service = BookService(db)
+        cursor = service.get_books_page(limit=20, sort=sort).next_cursor
+        return service.get_books_page(cursor=cursor, limit=20, sort=sort)
+
+    return [
+        HotQuery("user_books_read",
+                 lambda db: UserBookService(db).get_user_books_with_status(user_id, is_read=True, limit=20),
+                 no_full_scan=["user_book_status", "books"], covered=["user_book_status"]),
+        HotQuery("user_books_page_unread",
+                 lambda db: UserBookService(db).get_user_books_page(user_id, is_read=False, limit=20),
+                 no_full_scan=["user_book_status", "books"]),
+        HotQuery("reading_stats",
+                 lambda db: count_reading_stats(db, user_id),
+                 no_full_scan=["user_book_status"], covered=["user_book_status"]),
+        HotQuery("books_with_read_status",
+                 lambda db: BookService(db).get_books_with_read_status(user_id, limit=20),
+                 no_full_scan=["user_book_status"]),
+        HotQuery("books_page_title",
+                 lambda db: second_page(db, "title"),
+                 no_full_scan=["books"], no_sort=True),
+        HotQuery("books_page_author_desc",
+                 lambda db: second_page(db, "-author"),
+                 no_full_scan=["books"], no_sort=True),
+        HotQuery("books_page_published_year",
+                 lambda db: second_page(db, "published_year"),
+                 no_full_scan=["books"], no_sort=True),
+        HotQuery("book_statuses",
+                 lambda db: db.get(Book, book_id).user_statuses,
+                 no_full_scan=["user_book_status"]),
+    ]
+
+
+Plan = Tuple[List[str], List[str], List[str], bool]
+
+
+def sqlite_plan(connection, statement: str, parameters) -> Plan:
+    """Plan lines, fully scanned tables, index-only tables and whether a sort is needed, on SQLite."""
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    lines = [row[3] for row in rows]
+    scanned, covered = [], []
+    for line in lines:
+        words = line.split()
+        if words[0] not in ("SCAN", "SEARCH"):
+            continue
+        # "SCAN books" reads the whole table ("SCAN books USING INDEX ..." walks an index in
+        # order); "(ANY(user_id) AND ...)" is a skip-scan over every value of an index prefix
+        if (words[0] == "SCAN" and len(words) == 2) or "(ANY(" in line:
+            scanned.append(words[1])
+        if "USING COVERING INDEX" in line or "USING INTEGER PRIMARY KEY" in line:
+            covered.append(words[1])
+    sorts = any("USE TEMP B-TREE FOR ORDER BY" in line for line in lines)
+    return lines, scanned, covered, sorts
+
+
+def postgres_plan(connection, statement: str, parameters) -> Plan:
+    """Plan nodes, fully scanned tables, index-only tables and whether a sort is needed, on PostgreSQL."""
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    connection.exec_driver_sql("SET LOCAL enable_sort = off")
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    lines, scanned, covered, sorts = [], [], [], False
+    nodes = [(plan[0]["Plan"], 0)]
+    while nodes:
+        node, depth = nodes.pop()
+        relation = node.get("Relation Name")
+        index = node.get("Index Name")
+        lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "")
+                     + (f" using {index}" if index else ""))
+        if node["Node Type"] == "Seq Scan":
+            scanned.append(relation)
+        if node["Node Type"] == "Index Only Scan":
+            covered.append(relation)
+        if node["Node Type"] in ("Sort", "Incremental Sort"):
+            sorts = True
+        nodes.extend((child, depth + 1) for child in reversed(node.get("Plans", [])))
+    return lines, scanned, covered, sorts
+
+
+def check(engine, query: HotQuery) -> Dict[str, Any]:
+    """Run ``query`` once, then plan the last statement it emitted."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as db:
+            query.run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plan = sqlite_plan if engine.dialect.name == "sqlite" else postgres_plan
+    # The last statement is the query under test (earlier ones fetch its inputs, e.g. a cursor)
+    statement, parameters = statements[-1]
+    with engine.connect() as connection, connection.begin():
+        lines, scanned, covered, sorts = plan(connection, statement, parameters)
+
+    problems = [f"full scan of {table}" for table in scanned if table in query.no_full_scan]
+    problems.extend(f"{table} rows read instead of an index-only scan"
+                    for table in query.covered if table not in covered)
+    if query.no_sort and sorts:
+        problems.append("sorts instead of reading an index in order")
+    return {
+        "query": query.name,
+        "passed": not problems,
+        "problems": problems,
+        "plan": lines,
+        "statement": " ".join(statement.split()),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-chars")
+    os.environ["DEBUG"] = "false"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    from sqlalchemy import text
+
+    from app.core.database import engine
+    from benchmarks.bench_api import seed_database
+
+    seed_database(args)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+        user_id, book_id = connection.execute(
+            text("SELECT user_id, book_id FROM user_book_status ORDER BY id LIMIT 1")
+        ).one()
+
+    results = [check(engine, query) for query in hot_queries(user_id, book_id)]
+    print(json.dumps({
+        "benchmark": "query_plans",
+        "database": engine.dialect.name,
+        "books": args.books,
+        "passed": all(result["passed"] for result in results),
+        "results": results,
+    }, indent=2))
+
+    if not all(result["passed"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark fetching and serializing a page of books for a list endpoint.
+
+Seeds a throwaway SQLite catalog and times one page of --books books (1000
+by default) through each path, fetch and serialization separately:
+
+- ``fastapi_default``: ORM entities validated through ``List[BookResponse]``
+  by FastAPI's response handling, ``jsonable_encoder`` and the stdlib encoder
+  (list endpoints without FAST_JSON_RESPONSES).
+- ``type_adapter``: ORM entities validated and dumped by a pydantic
+  ``TypeAdapter`` (the cached ``GET /books/`` without FAST_JSON_RESPONSES).
+- ``fast_rows``: the FAST_JSON_RESPONSES path: plain column rows projected to
+  dicts and encoded with orjson (when installed) or pydantic-core.
+
+Medians in milliseconds are printed as JSON:
+
+    python -m benchmarks.bench_serialization --books 1000 --repeats 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=1000, help="Books per page")
+    parser.add_argument("--repeats", type=int, default=50, help="Timed runs per path")
+    return parser.parse_args()
+
+
+def median_ms(timings: List[float]) -> float:
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def time_path(repeats: int, fetch: Callable[[], object], serialize: Callable[[object], bytes]) -> Dict[str, float]:
+    """Median fetch and serialization time of one page."""
+    fetch_times, serialize_times = [], []
+    size = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        content = fetch()
+        fetched = time.perf_counter()
+        body = serialize(content)
+        fetch_times.append(fetched - start)
+        serialize_times.append(time.perf_counter() - fetched)
+        size = len(body)
+    return {
+        "fetch_ms": median_ms(fetch_times),
+        "serialize_ms": median_ms(serialize_times),
+        "total_ms": round(median_ms(fetch_times) + median_ms(serialize_times), 3),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-at-least-32-chars")
+    os.environ["DEBUG"] = "false"
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from pydantic import TypeAdapter
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal, create_tables
+    from app.core.responses import JSON_ENCODER, dumps
+    from app.models.book import Book
+    from app.schemas.book import BookResponse
+    from app.services.book_service import project_books
+
+    create_tables()
+    with SessionLocal() as db:
+        db.execute(insert(Book), [
+            {
+                "title": f"Title {i}",
+                "author": f"Author {i % 97}",
+                "published_year": 1900 + i % 120,
+                "genre": f"genre-{i % 20}",
+                "description": "A description of moderate length for a catalog entry. " * 4,
+                "isbn": f"978{i:010d}",
+            }
+            for i in range(args.books)
+        ])
+        db.commit()
+
+    field = create_response_field(name="Response_get_books", type_=List[BookResponse])
+    adapter = TypeAdapter(List[BookResponse])
+    loop = asyncio.new_event_loop()
+
+    def fetch_entities():
+        with SessionLocal() as db:
+            return db.query(Book).limit(args.books).all()
+
+    def fetch_rows():
+        with SessionLocal() as db:
+            return project_books(db.query(Book).limit(args.books))
+
+    def fastapi_default(books) -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=books, is_coroutine=True))
+        return JSONResponse(content).body
+
+    results = {
+        "fastapi_default": time_path(args.repeats, fetch_entities, fastapi_default),
+        "type_adapter": time_path(args.repeats, fetch_entities,
+                                  lambda books: adapter.dump_json(adapter.validate_python(books))),
+        "fast_rows": time_path(args.repeats, fetch_rows, dumps),
+    }
+    loop.close()
+
+    print(json.dumps({
+        "benchmark": "serialization",
+        "books": args.books,
+        "fast_encoder": JSON_ENCODER,
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Shared pytest setup.
+
+The application reads its settings once, at import, so the environment is
+prepared here before any test module imports ``app``: a throwaway SQLite
+database and strict per-route query budgets. In strict mode a request issuing
+more statements than its route allows raises ``QueryBudgetExceeded`` and fails
+the test that sent it, which catches N+1 queries as they are introduced.
+"""
+
+import itertools
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Authenticated routes spend one statement resolving a token the first time
+# it is used, hence the default of 2; catalog reads are anonymous.
+QUERY_BUDGETS = {
+    "GET /api/v1/books/": 1,
+    "GET /api/v1/books/page": 1,
+    "GET /api/v1/books/{book_id}": 1,
+    "GET /api/v1/books/stats/count": 1,
+    "PUT /api/v1/books/{book_id}": 3,
+    "DELETE /api/v1/books/{book_id}": 4,
+    "POST /api/v1/users/books/{book_id}/read": 3,
+    "POST /api/v1/users/books/{book_id}/unread": 3,
+    "POST /api/v1/users/me/books/status": 3,
+}
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/test.db",
+    "SECRET_KEY": "test-secret-key-with-at-least-32-characters",
+    "DEBUG": "false",
+    "DB_QUERY_BUDGET": "2",
+    "DB_QUERY_BUDGETS": json.dumps(QUERY_BUDGETS),
+    "DB_QUERY_BUDGET_STRICT": "true",
+    "RESPONSE_CACHE_BACKEND": "memory",
+    "RATE_LIMIT_PER_SECOND": "0",
+})
+
+API = "/api/v1"
+PASSWORD = "Passw0rd-for-tests"
+
+_sequence = itertools.count(1)
+
+
+def unique(prefix: str) -> str:
+    """Return a name no other test uses, so tests can share one database."""
+    return f"{prefix}{next(_sequence)}"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client running the application lifespan (table creation) once."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app, base_url="http://localhost") as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def unique_name():
+    """Factory of names no other test uses."""
+    return unique
+
+
+@pytest.fixture
+def auth_headers(client) -> Dict[str, str]:
+    """Authorization header of a freshly registered user."""
+    username = unique("reader")
+    response = client.post(f"{API}/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD,
+        "full_name": "Test Reader",
+    })
+    assert response.status_code == 201, response.text
+    response = client.post(f"{API}/auth/login", data={"username": username, "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def make_book(client, auth_headers) -> Callable[..., Dict[str, Any]]:
+    """Factory creating a book through the API and returning its JSON."""
+    def create_book(**fields: Any) -> Dict[str, Any]:
+        book = {
+            "title": unique("Title "),
+            "author": "Test Author",
+            "published_year": 2000,
+            "genre": "fiction",
+            "isbn": f"978{next(_sequence):010d}",
+            **fields,
+        }
+        response = client.post(f"{API}/books/", json=book, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    return create_book
+
+
+@pytest.fixture
+def db_session():
+    """Session on the test database, for service-level tests."""
+    from app.core.database import SessionLocal, create_tables
+
+    create_tables()
+    with SessionLocal() as session:
+        yield session
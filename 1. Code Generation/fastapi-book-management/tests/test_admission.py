@@ -0,0 +1,252 @@
+"""
+Tests for admission control: the per-class limiter, rate limiting and the middleware.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app.core import admission
+from app.core.admission import (
+    AdmissionControlMiddleware,
+    ConcurrencyLimiter,
+    Overloaded,
+    TokenBucketLimiter,
+    client_key,
+    default_limits,
+    route_class,
+)
+from app.core.auth_cache import AuthenticatedUser, token_user_cache
+from app.core.security import create_access_token
+
+
+async def settle():
+    """Let every ready task run until it blocks."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def make_limiter(limit=1, max_queue=10, max_wait_seconds=5.0) -> ConcurrencyLimiter:
+    return ConcurrencyLimiter("test", limit, max_queue, max_wait_seconds)
+
+
+def test_release_hands_the_slot_to_the_next_waiter_in_order():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire()
+        admitted = []
+
+        async def wait(name):
+            await limiter.acquire()
+            admitted.append(name)
+
+        waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+        await settle()
+        assert (limiter.in_flight, limiter.queued) == (1, 2)
+
+        limiter.release()
+        await settle()
+        # The slot passed straight to the first waiter: it was never free
+        assert admitted == ["first"]
+        assert (limiter.in_flight, limiter.queued) == (1, 1)
+
+        limiter.release()
+        await asyncio.gather(*waiters)
+        limiter.release()
+        return admitted, limiter.stats()
+
+    admitted, stats = asyncio.run(scenario())
+    assert admitted == ["first", "second"]
+    assert (stats["in_flight"], stats["queued"], stats["admitted"], stats["rejected"]) == (0, 0, 3, 0)
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        limiter = make_limiter(max_queue=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        with pytest.raises(Overloaded) as rejected:
+            await limiter.acquire()
+        waiter.cancel()
+        return rejected.value
+
+    assert asyncio.run(scenario()).reason == "queue_full"
+
+
+def test_request_expected_to_miss_its_deadline_is_rejected_at_once():
+    async def scenario():
+        limiter = make_limiter(max_wait_seconds=1.0)
+        limiter.service_seconds = 3.0
+        await limiter.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await limiter.acquire()
+        return rejected.value, limiter.queued
+
+    rejected, queued = asyncio.run(scenario())
+    assert rejected.reason == "deadline"
+    assert rejected.retry_after == pytest.approx(3.0)
+    assert queued == 0
+
+
+def test_wait_times_out():
+    async def scenario():
+        limiter = make_limiter(max_wait_seconds=0.05)
+        await limiter.acquire()
+        with pytest.raises(Overloaded) as rejected:
+            await limiter.acquire()
+        return rejected.value, limiter
+
+    rejected, limiter = asyncio.run(scenario())
+    assert rejected.reason == "timeout"
+    assert (limiter.in_flight, limiter.queued, limiter.rejected) == (1, 0, 1)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+        waiter.cancel()
+        await settle()
+        queued = limiter.queued
+        limiter.release()
+        return queued, limiter.in_flight
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_slot_handed_to_a_cancelled_waiter_is_passed_on():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        next_waiter = asyncio.create_task(limiter.acquire())
+        await settle()
+
+        # The slot is handed to the waiter after its cancellation, before it wakes up
+        cancelled.cancel()
+        limiter.release()
+        await settle()
+        await asyncio.wait_for(next_waiter, 1)
+        return cancelled.cancelled(), limiter.in_flight, limiter.queued
+
+    assert asyncio.run(scenario()) == (True, 1, 0)
+
+
+def test_token_bucket(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=2.0, burst=3, max_keys=2)
+
+    assert [limiter.take("alice") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.take("alice") == pytest.approx(0.5)
+    assert limiter.take("bob") == 0.0
+
+    now[0] += 0.5
+    assert limiter.take("alice") == 0.0
+    assert limiter.take("alice") > 0
+    assert limiter.limited == 2
+
+    # A third client evicts the least recently seen one, which starts afresh
+    limiter.take("carol")
+    assert [limiter.take("bob") for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_default_limits_follow_the_pool():
+    assert default_limits(15) == {"auth": 3, "write": 3, "stream": 1, "read": 8}
+    assert default_limits(15, replicas=2) == {"auth": 3, "write": 3, "stream": 1, "read": 38}
+    assert default_limits(1) == {"auth": 1, "write": 1, "stream": 1, "read": 1}
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("POST", "/api/v1/auth/login", "auth"),
+    ("GET", "/api/v1/books/", "read"),
+    ("GET", "/api/v1/books/export", "stream"),
+    ("POST", "/api/v1/books/import", "stream"),
+    ("POST", "/api/v1/books/", "write"),
+    ("GET", "/api/v1/books/exports", "read"),
+])
+def test_route_class(method, path, expected):
+    assert route_class(method, path) == expected
+
+
+def scope_with(authorization=None, client=("10.0.0.1", 1234)):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return {"type": "http", "headers": headers, "client": client}
+
+
+def test_client_key_is_the_token_subject():
+    first = create_access_token({"sub": "alice", "jti": "1"})
+    second = create_access_token({"sub": "alice", "jti": "2"})
+    assert first != second
+
+    assert client_key(scope_with(f"Bearer {first}")) == "user:alice"
+    assert client_key(scope_with(f"Bearer {second}")) == "user:alice"
+    assert client_key(scope_with("Bearer not-a-token")) == "ip:10.0.0.1"
+    assert client_key(scope_with(client=None)) == "ip:unknown"
+
+    token_user_cache.set("cached-token", AuthenticatedUser(id=1, username="bob", is_active=True))
+    assert client_key(scope_with("Bearer cached-token")) == "user:bob"
+
+
+def test_middleware_sheds_load_with_retry_after(monkeypatch):
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    async def scenario():
+        monkeypatch.setattr(admission, "limiters", {"read": make_limiter(max_queue=0)})
+        transport = httpx.ASGITransport(app=AdmissionControlMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            admitted = asyncio.create_task(http.get("/api/v1/books/"))
+            await settle()
+            rejected = await http.get("/api/v1/books/")
+            unlimited = asyncio.create_task(http.post("/api/v1/books/"))
+            release.set()
+            return await admitted, rejected, await unlimited
+
+    admitted, rejected, unlimited = asyncio.run(scenario())
+    assert admitted.status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.headers["retry-after"] == "1"
+    assert rejected.json()["type"] == "overloaded"
+    assert unlimited.status_code == 200
+
+
+def test_slow_export_does_not_hold_a_read_slot(monkeypatch):
+    resume_stream = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"].endswith("/export"):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"first", "more_body": True})
+            await resume_stream.wait()
+            await send({"type": "http.response.body", "body": b"last"})
+            return
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    async def scenario():
+        read, stream = make_limiter(max_queue=0), make_limiter(max_queue=0)
+        monkeypatch.setattr(admission, "limiters", {"read": read, "stream": stream})
+        transport = httpx.ASGITransport(app=AdmissionControlMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            export = asyncio.create_task(http.get("/api/v1/books/export"))
+            await settle()
+            page = await http.get("/api/v1/books/")
+            second_export = await http.get("/api/v1/books/export")
+            in_flight = (read.in_flight, stream.in_flight)
+            resume_stream.set()
+            return page, second_export, await export, in_flight
+
+    page, second_export, export, in_flight = asyncio.run(scenario())
+    assert page.status_code == 200
+    # The streaming export holds the single stream slot, not a read slot
+    assert second_export.status_code == 503
+    assert in_flight == (0, 1)
+    assert export.content == b"firstlast"
@@ -0,0 +1,62 @@
+"""
+Tests for the streaming import parsers.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.book_import import iter_csv_records
+
+
+def parse_csv(body: str, chunk_size: int):
+    async def stream():
+        data = body.encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    async def collect():
+        return [record async for record in iter_csv_records(stream())]
+
+    return asyncio.run(collect())
+
+
+CHUNK_SIZES = [1, 7, 4096]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_bare_quote_is_literal(chunk_size):
+    body = (
+        "title,author,published_year\n"
+        '12" Singles,Bob,1999\n'
+        "Dune,Frank Herbert,1965\n"
+        "Emma,Jane Austen,1815\n"
+    )
+    assert parse_csv(body, chunk_size) == [
+        (2, {"title": '12" Singles', "author": "Bob", "published_year": "1999"}),
+        (3, {"title": "Dune", "author": "Frank Herbert", "published_year": "1965"}),
+        (4, {"title": "Emma", "author": "Jane Austen", "published_year": "1815"}),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_quoted_field_spanning_lines(chunk_size):
+    body = (
+        "title,author,description\r\n"
+        'Dune,Frank Herbert,"line one\r\nline ""two""\r\n\r\nline four"\r\n'
+        "\r\n"
+        "Emma,Jane Austen,\r\n"
+    )
+    assert parse_csv(body, chunk_size) == [
+        (2, {"title": "Dune", "author": "Frank Herbert", "description": 'line one\nline "two"\n\nline four'}),
+        (7, {"title": "Emma", "author": "Jane Austen", "description": None}),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_unterminated_quote_is_reported(chunk_size):
+    body = 'title,author\nDune,Frank Herbert\n"Emma,Jane Austen\nPersuasion,Jane Austen'
+    assert parse_csv(body, chunk_size) == [
+        (2, {"title": "Dune", "author": "Frank Herbert"}),
+        (3, "Unterminated quoted field"),
+    ]
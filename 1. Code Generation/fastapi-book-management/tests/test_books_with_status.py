@@ -0,0 +1,36 @@
+"""
+Tests for the books-with-read-status listing.
+"""
+
+from app.core.config import get_settings
+
+API = get_settings().API_V1_STR
+
+
+def test_listing_with_status_is_one_query(client, auth_headers, make_book, unique_name):
+    genre = unique_name("genre")
+    books = [make_book(genre=genre) for _ in range(5)]
+    response = client.post(f"{API}/users/me/books/status", headers=auth_headers, json={
+        "items": [{"book_id": books[0]["id"], "is_read": True}, {"book_id": books[1]["id"], "is_read": False}]
+    })
+    assert response.status_code == 200
+
+    response = client.get(f"{API}/books/with-status", params={"genre": genre}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["x-db-queries"] == "1"
+    assert [book["is_read"] for book in response.json()] == [True, False, None, None, None]
+
+
+def test_other_users_statuses_are_not_joined(client, make_book, unique_name, auth_headers):
+    genre = unique_name("genre")
+    book = make_book(genre=genre)
+    client.post(f"{API}/users/books/{book['id']}/read", headers=auth_headers)
+
+    username = unique_name("other")
+    client.post(f"{API}/auth/register", json={"username": username, "email": f"{username}@example.com",
+                                              "password": "Passw0rd-for-tests", "full_name": "Other"})
+    token = client.post(f"{API}/auth/login", data={"username": username, "password": "Passw0rd-for-tests"})
+    other = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+    response = client.get(f"{API}/books/with-status", params={"genre": genre}, headers=other)
+    assert [(item["id"], item["is_read"]) for item in response.json()] == [(book["id"], None)]
@@ -0,0 +1,172 @@
+"""
+Tests for the generation-versioned response cache and its ETags.
+"""
+
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.core.cache import CacheBackend, MemoryCacheBackend, ResponseCache, etag_matches, make_etag
+from app.core.config import get_settings
+
+API = get_settings().API_V1_STR
+
+
+def make_request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class Renderer:
+    """Render callback counting its calls; the body changes with ``version``."""
+
+    def __init__(self):
+        self.calls = 0
+        self.version = 1
+
+    async def __call__(self):
+        self.calls += 1
+        return f'{{"version": {self.version}}}'.encode()
+
+
+def respond(cache, render, if_none_match=None, replica=False, **params):
+    return asyncio.run(cache.respond(make_request(if_none_match), "list", params, render, replica=replica))
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(MemoryCacheBackend(max_entries=100), ttl_seconds=60, namespace="test",
+                         replica_lag_seconds=5)
+
+
+def test_hit_after_miss_and_equivalent_params_share_a_key(cache):
+    render = Renderer()
+    miss = respond(cache, render, genre="SciFi", author=None)
+    hit = respond(cache, render, genre="scifi")
+
+    assert (miss.headers["x-cache"], hit.headers["x-cache"]) == ("MISS", "HIT")
+    assert render.calls == 1
+    assert hit.body == miss.body
+    assert hit.headers["etag"] == miss.headers["etag"] == make_etag(miss.body)
+
+
+def test_invalidation_starts_a_new_generation(cache):
+    render = Renderer()
+    before = respond(cache, render)
+    render.version = 2
+    asyncio.run(cache.invalidate())
+
+    after = respond(cache, render, if_none_match=before.headers["etag"])
+    assert after.status_code == 200
+    assert after.headers["x-cache"] == "MISS"
+    assert after.headers["etag"] != before.headers["etag"]
+    assert render.calls == 2
+
+
+def test_matching_if_none_match_gets_304(cache):
+    render = Renderer()
+    etag = respond(cache, render).headers["etag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = respond(cache, render, if_none_match=header)
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+    assert cache.not_modified == 4
+
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_replica_reads_are_not_stored_right_after_a_write(cache):
+    render = Renderer()
+    asyncio.run(cache.invalidate())
+    assert respond(cache, render, replica=True).headers["x-cache"] == "BYPASS"
+    assert respond(cache, render).headers["x-cache"] == "MISS"
+    assert respond(cache, render, replica=True).headers["x-cache"] == "HIT"
+
+    cache.replica_lag_seconds = 0
+    asyncio.run(cache.invalidate())
+    assert respond(cache, render, replica=True).headers["x-cache"] == "MISS"
+
+
+def test_missing_resource_is_not_cached(cache):
+    calls = []
+
+    async def render_nothing():
+        calls.append(1)
+        return None
+
+    assert respond(cache, render_nothing) is None
+    assert respond(cache, render_nothing) is None
+    assert len(calls) == 2
+    assert len(cache.backend) == 0
+
+
+def test_backend_interface_is_abstract():
+    class PartialBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialBackend()
+
+
+def test_book_list_is_one_query_then_cached(client, make_book, unique_name):
+    genre = unique_name("genre")
+    for _ in range(3):
+        make_book(genre=genre)
+
+    response = client.get(f"{API}/books/", params={"genre": genre})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert response.headers["x-cache"] == "MISS"
+    assert response.headers["x-db-queries"] == "1"
+
+    cached = client.get(f"{API}/books/", params={"genre": genre.upper()})
+    assert cached.headers["x-cache"] == "HIT"
+    assert cached.headers["x-db-queries"] == "0"
+    assert cached.content == response.content
+
+    not_modified = client.get(f"{API}/books/", params={"genre": genre},
+                              headers={"If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["x-db-queries"] == "0"
+
+
+def test_write_invalidates_cached_reads(client, auth_headers, make_book):
+    book = make_book()
+    first = client.get(f"{API}/books/{book['id']}")
+    assert first.headers["x-cache"] == "MISS"
+
+    response = client.put(f"{API}/books/{book['id']}", json={"title": "Renamed"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    fresh = client.get(f"{API}/books/{book['id']}", headers={"If-None-Match": first.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.headers["x-cache"] == "MISS"
+    assert fresh.json()["title"] == "Renamed"
+    assert fresh.headers["etag"] != first.headers["etag"]
+
+
+def test_memory_backend_uses_the_short_ttl():
+    from app.core.cache import book_response_cache
+
+    settings = get_settings()
+    assert settings.RESPONSE_CACHE_BACKEND == "memory"
+    assert book_response_cache.ttl_seconds == settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS
+    assert book_response_cache.ttl_seconds < settings.RESPONSE_CACHE_TTL_SECONDS
+
+
+def test_memory_backend_warns_with_several_workers(monkeypatch, caplog):
+    from app.core import cache as cache_module
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with caplog.at_level("WARNING", logger=cache_module.logger.name):
+        backend = cache_module.create_cache_backend()
+    assert isinstance(backend, MemoryCacheBackend)
+    assert "4 workers" in caplog.text
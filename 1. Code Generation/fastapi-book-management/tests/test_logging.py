@@ -0,0 +1,27 @@
+"""
+Tests for the queued logging set-up.
+"""
+
+import logging
+
+from app.core import logging as app_logging
+
+
+def test_setup_replaces_only_its_own_handler():
+    root = logging.getLogger()
+    foreign = logging.NullHandler()
+    root.addHandler(foreign)
+    try:
+        app_logging.setup_logging()
+        app_logging.setup_logging()
+        queue_handlers = [h for h in root.handlers if isinstance(h, app_logging.DroppingQueueHandler)]
+        assert queue_handlers == [app_logging._queue_handler]
+        assert foreign in root.handlers
+    finally:
+        root.removeHandler(foreign)
+
+
+def test_record_metadata_is_collected_by_default():
+    assert app_logging.settings.LOG_SKIP_RECORD_METADATA is False
+    assert logging.logProcesses is True
+    assert logging._srcfile is not None
@@ -0,0 +1,169 @@
+"""
+Tests for cursor encoding and keyset pagination, in the service and through the API.
+"""
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import get_settings
+from app.core.exceptions import ValidationError
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.book import Book
+from app.services.book_service import BookService
+
+settings = get_settings()
+API = settings.API_V1_STR
+
+AUTHORS = ["Le Guin", "Austen", "Le Guin", "Borges", "Austen", "Le Guin", "Calvino"]
+
+
+@pytest.fixture
+def catalog(db_session, unique_name):
+    """Genre of a fresh set of books whose authors repeat, so sorting has ties."""
+    genre = unique_name("paged")
+    db_session.execute(insert(Book), [
+        {"title": f"Book {i}", "author": author, "published_year": 1950 + i, "genre": genre}
+        for i, author in enumerate(AUTHORS)
+    ])
+    db_session.commit()
+    return genre
+
+
+def walk(service, genre, sort, limit, total="none"):
+    """Follow next_cursor through every page; return the books and each page's total."""
+    books, totals, cursor = [], [], None
+    while True:
+        page = service.get_books_page(cursor=cursor, limit=limit, sort=sort, genre=genre, total=total)
+        books += page.items
+        totals.append(page.total)
+        cursor = page.next_cursor
+        if cursor is None:
+            return books, totals
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("-title", ["Dune", 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "-title") == ["Dune", 42]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor("title", "Dune")[:-2], ""])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, "title")
+
+
+def test_cursor_of_another_sort_is_rejected():
+    with pytest.raises(ValidationError):
+        decode_cursor(encode_cursor("title", ["Dune", 1]), "-title")
+
+
+@pytest.mark.parametrize("sort", ["author", "-author", "id", "-id"])
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 10])
+def test_pages_cover_the_listing_in_order(db_session, catalog, sort, limit):
+    service = BookService(db_session)
+    books, _ = walk(service, catalog, sort, limit)
+
+    column = sort.lstrip("-")
+    expected = sorted(db_session.query(Book).filter(Book.genre == catalog),
+                      key=lambda book: (getattr(book, column), book.id), reverse=sort.startswith("-"))
+    assert [book.id for book in books] == [book.id for book in expected]
+
+
+def test_cursor_with_wrong_arity_is_rejected(db_session, catalog):
+    with pytest.raises(ValidationError):
+        BookService(db_session).get_books_page(cursor=encode_cursor("author", [1]), sort="author", genre=catalog)
+
+
+def test_cursor_pages_walk_the_listing(client, make_book, unique_name):
+    genre = unique_name("genre")
+    years = [1990, 2005, 1990, 2020, 2005, 1990, 2010]
+    books = [make_book(genre=genre, published_year=year) for year in years]
+    expected = [book["id"] for book in sorted(books, key=lambda book: (-book["published_year"], -book["id"]))]
+
+    seen, cursor = [], None
+    while True:
+        params = {"genre": genre, "sort": "-published_year", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"{API}/books/page", params=params)
+        assert response.status_code == 200
+        assert response.headers["x-db-queries"] == "1"
+        page = response.json()
+        seen += [book["id"] for book in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+def test_api_rejects_cursor_of_another_sort(client, make_book, unique_name):
+    genre = unique_name("genre")
+    for _ in range(2):
+        make_book(genre=genre)
+    page = client.get(f"{API}/books/page", params={"genre": genre, "limit": 1}).json()
+
+    response = client.get(f"{API}/books/page", params={"genre": genre, "sort": "title", "cursor": page["next_cursor"]})
+    assert response.status_code == 422
+
+
+def test_user_books_pages_follow_the_read_filter(client, auth_headers, make_book):
+    books = [make_book(title=title) for title in ("Emma", "Dune", "Beloved", "Carrie", "Atonement")]
+    response = client.post(f"{API}/users/me/books/status", headers=auth_headers, json={
+        "items": [{"book_id": book["id"], "is_read": book["title"] != "Carrie"} for book in books]
+    })
+    assert response.status_code == 200
+
+    titles, cursor = [], None
+    while True:
+        params = {"is_read": True, "sort": "title", "limit": 2, "total": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"{API}/users/me/books/page", params=params, headers=auth_headers).json()
+        titles += [book["title"] for book in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == ["Atonement", "Beloved", "Dune", "Emma"]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7])
+def test_exact_total_comes_with_the_first_page_only(db_session, catalog, limit):
+    _, totals = walk(BookService(db_session), catalog, "author", limit, total="exact")
+    assert totals[0] == len(AUTHORS)
+    assert set(totals[1:]) <= {None}
+
+
+def test_page_with_a_cursor_is_not_counted(db_session, catalog):
+    service = BookService(db_session)
+    last = service.get_books_page(limit=len(AUTHORS), sort="author", genre=catalog).items[-1]
+
+    page = service.get_books_page(cursor=encode_cursor("author", [last.author, last.id]), sort="author",
+                                  genre=catalog, total="exact")
+    assert page.items == []
+    assert page.next_cursor is None
+    assert page.total is None
+
+
+def test_estimated_total_falls_back_to_exact_count(db_session, catalog):
+    page = BookService(db_session).get_books_page(limit=2, genre=catalog, total="estimated")
+    assert page.total == len(AUTHORS)
+    assert page.total_estimated is False
+
+
+def test_page_and_total_are_one_query(client, make_book, unique_name):
+    genre = unique_name("genre")
+    for _ in range(3):
+        make_book(genre=genre)
+
+    response = client.get(f"{API}/books/page", params={"genre": genre, "limit": 2, "total": "exact"})
+    assert response.headers["x-db-queries"] == "1"
+    assert response.json()["total"] == 3
+
+    following = client.get(f"{API}/books/page", params={"genre": genre, "limit": 2,
+                                                        "cursor": response.json()["next_cursor"]})
+    assert following.headers["x-db-queries"] == "1"
+    assert following.json()["total"] is None
+    assert len(following.json()["items"]) == 1
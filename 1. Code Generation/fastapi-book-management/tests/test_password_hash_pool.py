@@ -0,0 +1,53 @@
+"""
+Tests for the bounded password hashing pool.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.metrics import registry
+from app.core.security import PasswordHashPool
+
+
+def test_cancelled_call_counts_until_its_thread_finishes():
+    started, finish = threading.Event(), threading.Event()
+
+    def hash_slowly():
+        started.set()
+        finish.wait(5)
+        return "hash"
+
+    async def scenario():
+        pool = PasswordHashPool(workers=1, max_queue=0)
+        request = asyncio.create_task(pool.run(hash_slowly))
+        await asyncio.to_thread(started.wait, 5)
+
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+        # The worker is still busy, so the pool stays full
+        counted = pool.in_flight
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(hash_slowly)
+
+        finish.set()
+        for _ in range(100):
+            if pool.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        pool.shutdown()
+        return request.cancelled(), counted, rejected.value.status_code, pool.stats()
+
+    cancelled, counted, status_code, stats = asyncio.run(scenario())
+    assert cancelled
+    assert counted == 1
+    assert status_code == 429
+    assert (stats["in_flight"], stats["queue_depth"], stats["rejected"]) == (0, 0, 1)
+
+
+def test_pool_gauges_are_exported():
+    rendered = registry.render()
+    assert "password_hash_in_flight 0" in rendered
+    assert "password_hash_queue_depth 0" in rendered
@@ -0,0 +1,31 @@
+"""
+Tests for the per-request query counter and strict query budgets (see conftest.py).
+"""
+
+import pytest
+
+from app.core.config import get_settings
+from app.core.request_metrics import QueryBudgetExceeded
+
+settings = get_settings()
+API = settings.API_V1_STR
+
+
+def test_responses_report_their_queries(client):
+    response = client.get(f"{API}/books/stats/count")
+    assert response.status_code == 200
+    assert response.headers["x-db-queries"] == "1"
+    assert response.headers["server-timing"].startswith('db;dur=')
+    assert 'desc="queries=1"' in response.headers["server-timing"]
+
+    # Requests outside the database are reported too
+    assert client.get("/health").headers["x-db-queries"] == "0"
+
+
+def test_strict_budget_fails_requests_over_budget(client, auth_headers, make_book, monkeypatch):
+    book = make_book()
+    monkeypatch.setitem(settings.DB_QUERY_BUDGETS, "PUT /api/v1/books/{book_id}", 1)
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.put(f"{API}/books/{book['id']}", json={"title": "Over budget"}, headers=auth_headers)
+
@@ -0,0 +1,56 @@
+"""
+Tests for read-your-writes pinning after writes.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.responses import PlainTextResponse
+
+from app.core.config import get_settings
+from app.core.read_replicas import READ_PRIMARY_COOKIE, ReadYourWritesMiddleware, read_your_writes
+from app.core.security import create_access_token
+
+API = get_settings().API_V1_STR
+
+
+def send(method, path, status_code=200, token=None):
+    async def app(scope, receive, send):
+        await PlainTextResponse("ok", status_code=status_code)(scope, receive, send)
+
+    async def request():
+        transport = httpx.ASGITransport(app=ReadYourWritesMiddleware(app))
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.request(method, path, headers=headers)
+
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("method, path", [
+    ("POST", f"{API}/books/"),
+    ("PUT", f"{API}/books/1"),
+    ("DELETE", f"{API}/books/1"),
+    ("POST", f"{API}/books/import"),
+    ("POST", f"{API}/users/books/1/read"),
+    ("POST", f"{API}/users/me/books/status"),
+])
+def test_catalog_and_status_writes_pin_the_client(method, path):
+    token = create_access_token({"sub": "writer", "jti": path})
+    response = send(method, path, token=token)
+    assert READ_PRIMARY_COOKIE in response.cookies
+    assert read_your_writes.is_pinned(token)
+
+
+@pytest.mark.parametrize("method, path, status_code", [
+    ("POST", f"{API}/auth/login", 200),
+    ("POST", f"{API}/auth/register", 201),
+    ("GET", f"{API}/books/", 200),
+    ("POST", f"{API}/books/", 422),
+])
+def test_other_requests_do_not_pin_the_client(method, path, status_code):
+    token = create_access_token({"sub": "reader", "jti": f"{method} {path} {status_code}"})
+    response = send(method, path, status_code, token=token)
+    assert READ_PRIMARY_COOKIE not in response.cookies
+    assert not read_your_writes.is_pinned(token)
@@ -0,0 +1,137 @@
+"""
+Tests for the reading-status upsert and the maintained reading counters.
+"""
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.config import get_settings
+from app.models.book import Book
+from app.models.user import User
+from app.models.user_book_status import UserBookStatus
+from app.models.user_reading_stats import UserReadingStats
+from app.schemas.user_book_status import UserBookStatusCreate
+from app.services import user_book_service
+from app.services.book_service import BookService
+from app.services.reading_stats import count_reading_stats
+from app.services.user_book_service import UserBookService
+
+settings = get_settings()
+API = settings.API_V1_STR
+
+
+@pytest.fixture(params=["upsert", "merge"])
+def service(request, db_session, monkeypatch):
+    """UserBookService writing through ON CONFLICT, or through the get-or-create fallback."""
+    if request.param == "merge":
+        monkeypatch.delitem(user_book_service.UPSERT_INSERTS, db_session.get_bind().dialect.name)
+    return UserBookService(db_session)
+
+
+@pytest.fixture
+def user_id(db_session, unique_name):
+    username = unique_name("statuses")
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x", updated_at=None)
+    db_session.add(user)
+    db_session.commit()
+    return user.id
+
+
+@pytest.fixture
+def book_ids(db_session):
+    return list(db_session.scalars(
+        insert(Book).returning(Book.id),
+        [{"title": f"Status {i}", "author": "Author", "published_year": 2000, "genre": "status"} for i in range(4)]
+    ))
+
+
+def set_statuses(service, user_id, states):
+    return service.set_reading_statuses(user_id, [
+        UserBookStatusCreate(book_id=book_id, is_read=is_read) for book_id, is_read in states
+    ])
+
+
+def stored_statuses(db_session, user_id):
+    rows = db_session.execute(
+        select(UserBookStatus.book_id, UserBookStatus.is_read, UserBookStatus.read_at)
+        .where(UserBookStatus.user_id == user_id)
+    )
+    return {book_id: (is_read, read_at is not None) for book_id, is_read, read_at in rows}
+
+
+def test_upsert_writes_one_row_per_book(db_session, service, user_id, book_ids):
+    first, second, third = book_ids[:3]
+    result = set_statuses(service, user_id, [(first, True), (second, True), (10 ** 9, True)])
+    assert sorted(status.book_id for status in result.statuses) == [first, second]
+    assert result.missing_book_ids == [10 ** 9]
+
+    # Existing rows are updated in place; the last item for a book wins
+    set_statuses(service, user_id, [(second, False), (third, False), (third, True)])
+    assert stored_statuses(db_session, user_id) == {
+        first: (True, True),
+        second: (False, False),
+        third: (True, True),
+    }
+
+
+def test_status_endpoints_upsert(client, auth_headers, make_book):
+    books = [make_book() for _ in range(3)]
+    for book in books:
+        response = client.post(f"{API}/users/books/{book['id']}/read", headers=auth_headers)
+        assert response.status_code == 200
+    response = client.post(f"{API}/users/books/{books[0]['id']}/unread", headers=auth_headers)
+    assert response.json()["is_read"] is False
+
+    response = client.post(f"{API}/users/me/books/status", headers=auth_headers, json={
+        "items": [{"book_id": books[1]["id"], "is_read": False}, {"book_id": 10 ** 9, "is_read": True}]
+    })
+    assert response.json()["missing_book_ids"] == [10 ** 9]
+
+    stats = client.get(f"{API}/users/me/stats", headers=auth_headers)
+    assert stats.json() == {"total_books": 3, "read_books": 1, "unread_books": 2, "reading_percentage": 33.33}
+
+    read = client.get(f"{API}/users/me/books/read", headers=auth_headers)
+    assert read.headers["x-db-queries"] == "1"
+    assert [book["id"] for book in read.json()] == [books[2]["id"]]
+
+
+def test_counters_follow_status_changes(db_session, service, user_id, book_ids, monkeypatch):
+    first, second, third, fourth = book_ids
+    # Statuses written before the counters existed are picked up when the row is created
+    set_statuses(service, user_id, [(first, True)])
+    monkeypatch.setattr(settings, "READING_STATS_COUNTERS", True)
+
+    steps = [
+        [(second, False)],
+        [(first, True), (second, True)],
+        [(third, True), (first, False)],
+        [(fourth, False), (fourth, True), (10 ** 9, True)],
+    ]
+    for states in steps:
+        set_statuses(service, user_id, states)
+        stats = db_session.get(UserReadingStats, user_id, populate_existing=True)
+        assert (stats.total_books, stats.read_books) == count_reading_stats(db_session, user_id)
+
+    service.mark_book_as_unread(user_id, second)
+    assert service.get_user_reading_stats(user_id) == {
+        "total_books": 4, "read_books": 2, "unread_books": 2, "reading_percentage": 50.0
+    }
+
+    BookService(db_session).delete_book(third)
+    stats = db_session.get(UserReadingStats, user_id, populate_existing=True)
+    assert (stats.total_books, stats.read_books) == (3, 1)
+
+
+@pytest.mark.parametrize("counters", [False, True])
+def test_stats_are_one_query(client, auth_headers, make_book, monkeypatch, counters):
+    monkeypatch.setattr(settings, "READING_STATS_COUNTERS", counters)
+    # A user's first write also creates the counter row, in a savepoint
+    monkeypatch.setitem(settings.DB_QUERY_BUDGETS, "POST /api/v1/users/me/books/status", 9)
+    books = [make_book() for _ in range(2)]
+    client.post(f"{API}/users/me/books/status", headers=auth_headers, json={
+        "items": [{"book_id": books[0]["id"], "is_read": True}, {"book_id": books[1]["id"], "is_read": False}]
+    })
+
+    stats = client.get(f"{API}/users/me/stats", headers=auth_headers)
+    assert stats.headers["x-db-queries"] == "1"
+    assert stats.json() == {"total_books": 2, "read_books": 1, "unread_books": 1, "reading_percentage": 50.0}
@@ -0,0 +1,164 @@
+"""
+Tests for single-flight coalescing of concurrent reads.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+
+
+class SlowRead:
+    """Read blocked until ``release`` is set; counts how often it ran."""
+
+    def __init__(self, result="books"):
+        self.result = result
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def settle():
+    """Let every ready task run until it blocks."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_identical_calls_share_one_execution():
+    async def scenario():
+        group = SingleFlight("test")
+        read = SlowRead()
+        tasks = [asyncio.create_task(group.do("list", ("page", 1), read)) for _ in range(5)]
+        other = asyncio.create_task(group.do("list", ("page", 2), read))
+        await settle()
+        read.release.set()
+        return await asyncio.gather(*tasks, other), read.calls, group
+
+    results, calls, group = asyncio.run(scenario())
+    assert results == ["books"] * 6
+    assert calls == 2
+    assert group.stats() == {"enabled": True, "in_flight": 0, "calls": 2, "coalesced": 4}
+
+
+def test_each_request_gets_its_own_copy_of_the_exception():
+    error = LookupError("gone")
+
+    async def scenario():
+        group = SingleFlight("test")
+        read = SlowRead(error)
+        tasks = [asyncio.create_task(group.do("get", 1, read)) for _ in range(3)]
+        await settle()
+        read.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True), read.calls
+
+    results, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert all(isinstance(result, LookupError) and result.args == ("gone",) for result in results)
+    assert len({id(result) for result in results}) == 3
+    leader, *followers = results
+    assert leader is error
+    assert all(follower.__cause__ is error for follower in followers)
+
+
+def test_coalesced_book_reads_share_plain_models(db_session, monkeypatch):
+    from app.models.book import Book
+    from app.schemas.book import BookResponse
+    from app.services.book_service import AsyncBookService, book_single_flight
+
+    book = Book(title="Shared", author="Author", published_year=2001, genre="coalesced")
+    db_session.add(book)
+    db_session.commit()
+    monkeypatch.setattr(book_single_flight, "enabled", True)
+
+    async def scenario():
+        service = AsyncBookService(db_session)
+        return await asyncio.gather(
+            service.get_book(book.id), service.get_book(book.id),
+            service.get_books(genre="coalesced"), service.get_books_page(genre="coalesced"),
+        )
+
+    first, second, books, page = asyncio.run(scenario())
+    assert isinstance(first, BookResponse) and first.title == "Shared"
+    assert second == first
+    assert all(isinstance(item, BookResponse) for item in books + page.items)
+
+
+def test_cancelled_leader_lets_followers_run_the_call():
+    async def scenario():
+        group = SingleFlight("test")
+        read = SlowRead()
+        leader = asyncio.create_task(group.do("get", 1, read))
+        await read.started.wait()
+        followers = [asyncio.create_task(group.do("get", 1, read)) for _ in range(2)]
+        await settle()
+
+        leader.cancel()
+        await settle()
+        read.release.set()
+        return leader, await asyncio.gather(*followers), read.calls
+
+    leader, results, calls = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert results == ["books", "books"]
+    # One follower takes over as leader, the other joins it
+    assert calls == 2
+
+
+def test_cancelled_follower_leaves_the_call_running():
+    async def scenario():
+        group = SingleFlight("test")
+        read = SlowRead()
+        leader = asyncio.create_task(group.do("get", 1, read))
+        await read.started.wait()
+        follower = asyncio.create_task(group.do("get", 1, read))
+        await settle()
+
+        follower.cancel()
+        await settle()
+        read.release.set()
+        return await leader, follower, read.calls
+
+    result, follower, calls = asyncio.run(scenario())
+    assert result == "books"
+    assert follower.cancelled()
+    assert calls == 1
+
+
+def test_calls_after_forget_do_not_join_earlier_reads():
+    async def scenario():
+        group = SingleFlight("test")
+        stale, fresh = SlowRead("stale"), SlowRead("fresh")
+        before = asyncio.create_task(group.do("get", 1, stale))
+        await stale.started.wait()
+
+        group.forget()
+        after = asyncio.create_task(group.do("get", 1, fresh))
+        await settle()
+        stale.release.set()
+        fresh.release.set()
+        return await before, await after, group.stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == ("stale", "fresh", 0)
+
+
+@pytest.mark.parametrize("enabled, expected_calls", [(True, 1), (False, 3)])
+def test_disabled_group_runs_every_call(enabled, expected_calls):
+    async def scenario():
+        group = SingleFlight("test", enabled=enabled)
+        read = SlowRead()
+        tasks = [asyncio.create_task(group.do("get", 1, read)) for _ in range(3)]
+        await settle()
+        read.release.set()
+        await asyncio.gather(*tasks)
+        return read.calls
+
+    assert asyncio.run(scenario()) == expected_calls